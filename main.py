@@ -5,16 +5,35 @@ A Telegram bot for monitoring and managing OpenStack VPS instances
 """
 
 import os
+import time
 import logging
+import logging.handlers
+import atexit
+import queue
+import functools
 import json
+import threading
+import orjson
 import requests
-from datetime import datetime, timedelta, timezone
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from collections import deque
+from itertools import islice
+from types import MappingProxyType
+from datetime import datetime, timezone
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import Application, CommandHandler, CallbackQueryHandler, ContextTypes, ConversationHandler, MessageHandler, filters
+from telegram.ext import AIORateLimiter, Application, BaseUpdateProcessor, CommandHandler, CallbackQueryHandler, ContextTypes, ConversationHandler, MessageHandler, filters
 import asyncio
 
 # Authorized user IDs - only these users can use the bot
-AUTHORIZED_USERS = [YourTelID]  # Add more user IDs as needed
+AUTHORIZED_USERS = frozenset({YourTelID})  # Add more user IDs as needed
+
+UNAUTHORIZED_TEXT = (
+    "❌ You are not authorized to use this bot.\n\n"
+    "Please contact @MmdHsn21 for access."
+)
 
 def is_authorized(user_id):
     """Check if user is authorized to use the bot"""
@@ -24,28 +43,93 @@ async def check_authorization(update: Update, context: ContextTypes.DEFAULT_TYPE
     """Check if user is authorized and send unauthorized message if not"""
     user_id = update.effective_user.id
     if not is_authorized(user_id):
-        await update.message.reply_text(
-            "❌ You are not authorized to use this bot.\n\n"
-            "Please contact @MmdHsn21 for access."
-        )
+        query = update.callback_query
+        if query:
+            await query.answer()
+            await query.edit_message_text(UNAUTHORIZED_TEXT)
+        else:
+            await update.message.reply_text(UNAUTHORIZED_TEXT)
         return False
     return True
 
-# Configure logging
-logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO,
-    handlers=[
-        logging.FileHandler('openstack_bot.log'),
-        logging.StreamHandler()
-    ]
-)
+def authorized(handler):
+    """Decorator that runs the handler only for authorized users"""
+    @functools.wraps(handler)
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        if not await check_authorization(update, context):
+            return
+        return await handler(update, context)
+    return wrapper
+
+# Configure logging: handlers only enqueue records, a background listener does the writes
+log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+file_handler = logging.handlers.RotatingFileHandler('openstack_bot.log', maxBytes=10 * 1024 * 1024, backupCount=5)
+file_handler.setFormatter(log_formatter)
+stream_handler = logging.StreamHandler()
+stream_handler.setFormatter(log_formatter)
+
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+root_logger = logging.getLogger()
+root_logger.setLevel(logging.INFO)
+root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+# HTTP client libraries log every request at INFO (including each getUpdates poll)
+logging.getLogger('urllib3').setLevel(logging.WARNING)
+logging.getLogger('httpx').setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
+class ErrorBody:
+    """Error response body for %s log arguments, decoded only if the record is emitted"""
+    __slots__ = ('response', 'limit')
+    
+    def __init__(self, response, limit=2048):
+        self.response = response
+        self.limit = limit
+    
+    def __str__(self):
+        return self.response.content[:self.limit].decode('utf-8', 'replace')
+
+# Failures an API method reports by returning None/False; anything else is a bug and propagates
+API_ERRORS = (requests.RequestException, KeyError, ValueError)
+
 # Conversation states
 SELECT_SERVER, CONFIRM_ACTION = range(2)
 
+@dataclass(slots=True)
+class RemoveIpCtx:
+    """Pending fixed IP removal awaiting user confirmation"""
+    ip_address: str
+    port_id: str
+    server_id: str
+    server_index: str
+
 class OpenStackAPI:
+    # Seconds to reuse rarely changing lookups before asking OpenStack again
+    NETWORKS_CACHE_TTL = 60
+    PUBLIC_NETWORK_CACHE_TTL = 600
+    FLOATING_IPS_CACHE_TTL = 15
+    SERVERS_CACHE_TTL = 30
+    # Full server list resync interval, and clock-skew overlap for incremental fetches (seconds)
+    SERVERS_FULL_RESYNC = 600
+    CHANGES_SINCE_MARGIN = 60
+    
+    # Attributes the bot reads from Neutron list responses; Neutron omits the rest
+    NETWORK_FIELDS = ['id', 'name', 'status', 'router:external']
+    SUBNET_FIELDS = ['id', 'name', 'network_id', 'cidr', 'gateway_ip']
+    ROUTER_FIELDS = ['id', 'name', 'external_gateway_info']
+    FLOATING_IP_FIELDS = ['id', 'floating_ip_address', 'fixed_ip_address', 'port_id', 'status']
+    # Server attributes kept in the cached list; the details view fetches the full server
+    SERVER_SUMMARY_FIELDS = ('id', 'name', 'status', 'created')
+    
+    # Renew tokens this many seconds before Keystone expires them
+    TOKEN_EXPIRY_MARGIN = 300
+    
+    # (connect, read) timeouts in seconds so a stuck connection can't hang a handler
+    REQUEST_TIMEOUT = (3, 10)
+    
     def __init__(self):
         self.auth_url = os.getenv('OS_AUTH_URL', 'http://cloud.sc1.awdaz.com:5000')
         self.username = os.getenv('OS_USERNAME', 'hs2')
@@ -55,265 +139,461 @@ class OpenStackAPI:
         self.user_domain_name = os.getenv('OS_USER_DOMAIN_NAME', 'Default')
         self.project_domain_id = os.getenv('OS_PROJECT_DOMAIN_ID', 'default')
         
+        # Password auth request body; the credentials don't change, so encode it once
+        self._auth_body = orjson.dumps({
+            "auth": {
+                "identity": {
+                    "methods": ["password"],
+                    "password": {
+                        "user": {
+                            "name": self.username,
+                            "domain": {"name": self.user_domain_name},
+                            "password": self.password
+                        }
+                    }
+                },
+                "scope": {
+                    "project": {
+                        "id": self.project_id,
+                        "domain": {"id": self.project_domain_id}
+                    }
+                }
+            }
+        })
+        
         self.token = None
-        self.token_expires = None
+        # Epoch seconds after which the token is renewed (expiry minus a safety margin)
+        self.token_expires_ts = 0.0
         self.service_catalog = {}
         
+        # Derived from the token and catalog at authentication time
+        self.headers = None
+        self.compute_url = None
+        self.network_url = None
+        
+        # One keep-alive connection pool shared by all API calls, sized for the worker threads
+        self.session = requests.Session()
+        # Transient connection failures and 429/503 are retried with backoff, honoring Retry-After
+        retry = Retry(
+            total=3,
+            backoff_factor=0.2,
+            status_forcelist=(429, 503),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # API calls run in worker threads; serialize token renewal between them
+        self._auth_lock = threading.Lock()
+        
+        # Cap in-flight calls per service so bursts of callbacks don't trip API rate limits
+        max_concurrent = int(os.getenv('OS_MAX_CONCURRENT_REQUESTS', '8'))
+        self._compute_sem = threading.BoundedSemaphore(max_concurrent)
+        self._network_sem = threading.BoundedSemaphore(max_concurrent)
+        
+        # Short-lived response cache: {key: (expires_at, value)}
+        self._cache = {}
+        
+        # Last full server list, refreshed incrementally with Nova's changes-since filter
+        self._servers_by_id = None
+        self._servers_full_sync = 0.0
+        self._servers_last_sync = 0.0
+        
+        # Reuse a still-valid token from a previous run instead of re-authenticating
+        self.token_cache_file = os.getenv('OS_TOKEN_CACHE_FILE', 'openstack_token.json')
+        self.load_cached_token()
+        
     def authenticate(self):
         """Authenticate with OpenStack and get token"""
         try:
-            auth_data = {
-                "auth": {
-                    "identity": {
-                        "methods": ["password"],
-                        "password": {
-                            "user": {
-                                "name": self.username,
-                                "domain": {"name": self.user_domain_name},
-                                "password": self.password
-                            }
-                        }
-                    },
-                    "scope": {
-                        "project": {
-                            "id": self.project_id,
-                            "domain": {"id": self.project_domain_id}
-                        }
-                    }
-                }
-            }
-            
-            response = requests.post(
+            response = self.session.post(
                 f"{self.auth_url}/v3/auth/tokens",
-                json=auth_data,
-                headers={"Content-Type": "application/json"}
+                data=self._auth_body,
+                headers={"Content-Type": "application/json"},
+                timeout=self.REQUEST_TIMEOUT
             )
             
             if response.status_code == 201:
                 self.token = response.headers.get('X-Subject-Token')
-                token_data = response.json()
+                token_data = orjson.loads(response.content)
                 
-                # Parse token expiration - ensure timezone awareness
+                # Parse token expiration once; validity checks then compare plain floats
                 expires_at = token_data['token']['expires_at']
-                # Convert to timezone-aware datetime
-                self.token_expires = datetime.fromisoformat(expires_at.replace('Z', '+00:00'))
+                expires = datetime.fromisoformat(expires_at.replace('Z', '+00:00'))
+                self.token_expires_ts = expires.timestamp() - self.TOKEN_EXPIRY_MARGIN
                 
-                # Store service catalog
-                for service in token_data['token']['catalog']:
-                    service_type = service['type']
-                    for endpoint in service['endpoints']:
-                        if endpoint['interface'] == 'public':
-                            self.service_catalog[service_type] = endpoint['url']
-                            break
+                # Store service catalog (first public endpoint per service, skipping services without one)
+                self.service_catalog = {
+                    service['type']: url
+                    for service in token_data['token']['catalog']
+                    if (url := next((e['url'] for e in service['endpoints'] if e['interface'] == 'public'), None))
+                }
                 
+                self.set_endpoints()
                 logger.info("Successfully authenticated with OpenStack")
+                self.save_cached_token()
                 return True
             else:
-                logger.error(f"Authentication failed: {response.status_code} - {response.text}")
+                logger.error("Authentication failed: %s - %s", response.status_code, ErrorBody(response))
                 return False
                 
-        except Exception as e:
+        except API_ERRORS as e:
             logger.error(f"Authentication error: {str(e)}")
             return False
     
-    def is_token_valid(self):
-        """Check if current token is still valid"""
-        if not self.token or not self.token_expires:
+    def set_endpoints(self):
+        """Cache request headers and service URLs for the current token"""
+        self.headers = {"X-Auth-Token": self.token, "Content-Type": "application/json"}
+        self.compute_url = self.service_catalog.get('compute')
+        self.network_url = self.service_catalog.get('network')
+        
+        if not self.compute_url:
+            logger.error("Compute service not found in catalog")
+        if not self.network_url:
+            logger.error("Network service not found in catalog")
+    
+    def close(self):
+        """Close pooled HTTP connections"""
+        self.session.close()
+    
+    def token_cache_key(self):
+        """Identify the credentials a cached token was issued for"""
+        return f"{self.auth_url}|{self.username}|{self.project_id}"
+    
+    def load_cached_token(self):
+        """Load the token saved by a previous run if it belongs to the same credentials"""
+        try:
+            with open(self.token_cache_file) as f:
+                cached = json.load(f)
+            
+            if cached.get('key') != self.token_cache_key():
+                return False
+            
+            self.token = cached['token']
+            self.token_expires_ts = float(cached['expires_ts'])
+            self.service_catalog = cached['service_catalog']
+            
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable token cache: {str(e)}")
+            return False
+        
+        if not self.is_token_valid():
+            self.token = None
             return False
         
-        # Ensure we're comparing timezone-aware datetimes
-        now = datetime.now(timezone.utc)
-        return now < self.token_expires - timedelta(minutes=5)
+        self.set_endpoints()
+        logger.info("Reusing cached OpenStack token")
+        return True
+    
+    def save_cached_token(self):
+        """Persist the current token so a restart can skip authentication"""
+        try:
+            cached = {
+                "key": self.token_cache_key(),
+                "token": self.token,
+                "expires_ts": self.token_expires_ts,
+                "service_catalog": self.service_catalog
+            }
+            # The token grants API access, keep the file private to the bot user
+            fd = os.open(self.token_cache_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(cached, f)
+                
+        except Exception as e:
+            logger.warning(f"Could not save token cache: {str(e)}")
+    
+    def invalidate_token(self, token):
+        """Drop a token that OpenStack rejected, unless another thread already replaced it"""
+        with self._auth_lock:
+            if self.token == token:
+                self.token = None
+                self.token_expires_ts = 0.0
+    
+    def is_token_valid(self):
+        """Check if current token is still valid"""
+        return self.token is not None and time.time() < self.token_expires_ts
     
     def get_headers(self):
         """Get headers with valid token"""
         if not self.is_token_valid():
-            if not self.authenticate():
-                return None
-        return {"X-Auth-Token": self.token, "Content-Type": "application/json"}
+            with self._auth_lock:
+                # Another thread may have renewed the token while we waited
+                if not self.is_token_valid() and not self.authenticate():
+                    return None
+        return self.headers
+    
+    def _request(self, method, url, **kwargs):
+        """Send an authenticated request, re-authenticating once if the token is rejected"""
+        kwargs.setdefault('timeout', self.REQUEST_TIMEOUT)
+        headers = self.get_headers()
+        sem = self._network_sem if self.network_url and url.startswith(self.network_url) else self._compute_sem
+        with sem:
+            response = self.session.request(method, url, headers=headers, **kwargs)
+        
+        if response.status_code == 401 and headers:
+            logger.warning("OpenStack rejected the token, re-authenticating")
+            self.invalidate_token(headers["X-Auth-Token"])
+            headers = self.get_headers()
+            if headers:
+                with sem:
+                    response = self.session.request(method, url, headers=headers, **kwargs)
+        
+        return response
+    
+    def _cached(self, key, ttl, fetch):
+        """Return the cached value for key, calling fetch() if it is missing or expired"""
+        now = time.monotonic()
+        entry = self._cache.get(key)
+        if entry and now < entry[0]:
+            return entry[1]
+        
+        value = fetch()
+        # Failed lookups are not cached so the next call retries
+        if value is not None:
+            self._cache[key] = (now + ttl, value)
+        return value
+    
+    def invalidate_cache(self, *keys):
+        """Drop cached responses after a change to the underlying resources"""
+        for key in keys:
+            self._cache.pop(key, None)
     
     def get_servers(self):
-        """Get list of all servers"""
+        """Get list of all servers (cached briefly, invalidated by interface and IP changes)"""
+        return self._cached('servers', self.SERVERS_CACHE_TTL, self.fetch_servers)
+    
+    def fetch_servers(self):
+        """Fetch list of all servers from Nova"""
         try:
-            headers = self.get_headers()
-            if not headers:
+            if not self.get_headers():
                 return None
                 
-            compute_url = self.service_catalog.get('compute')
+            compute_url = self.compute_url
             if not compute_url:
-                logger.error("Compute service not found in catalog")
                 return None
                 
-            response = requests.get(
+            # Between periodic full resyncs, ask Nova only for servers changed since the last fetch
+            started = time.time()
+            incremental = (self._servers_by_id is not None
+                           and started - self._servers_full_sync < self.SERVERS_FULL_RESYNC)
+            params = None
+            if incremental:
+                since = datetime.fromtimestamp(self._servers_last_sync - self.CHANGES_SINCE_MARGIN, timezone.utc)
+                params = {'changes-since': since.strftime('%Y-%m-%dT%H:%M:%SZ')}
+            
+            response = self._request(
+                'GET',
                 f"{compute_url}/servers/detail",
-                headers=headers
+                params=params
             )
             
             if response.status_code == 200:
-                return response.json()['servers']
+                servers = [
+                    {field: server.get(field) for field in self.SERVER_SUMMARY_FIELDS}
+                    for server in orjson.loads(response.content)['servers']
+                ]
+                if incremental:
+                    # changes-since also reports deleted servers, with status DELETED
+                    servers_by_id = dict(self._servers_by_id)
+                    for server in servers:
+                        if server['status'] == 'DELETED':
+                            servers_by_id.pop(server['id'], None)
+                        else:
+                            servers_by_id[server['id']] = server
+                    # Keep Nova's list order (newest first) so pages don't shift between full resyncs
+                    servers_by_id = dict(sorted(
+                        servers_by_id.items(),
+                        key=lambda item: (item[1]['created'] or '', item[0]),
+                        reverse=True
+                    ))
+                else:
+                    servers_by_id = {server['id']: server for server in servers}
+                    self._servers_full_sync = started
+                
+                self._servers_by_id = servers_by_id
+                self._servers_last_sync = started
+                return list(servers_by_id.values())
             else:
-                logger.error(f"Failed to get servers: {response.status_code} - {response.text}")
+                logger.error("Failed to get servers: %s - %s", response.status_code, ErrorBody(response))
                 return None
                 
-        except Exception as e:
+        except API_ERRORS as e:
             logger.error(f"Error getting servers: {str(e)}")
             return None
     
     def get_server_details(self, server_id):
         """Get detailed information about a specific server"""
         try:
-            headers = self.get_headers()
-            if not headers:
+            if not self.get_headers():
                 return None
                 
-            compute_url = self.service_catalog.get('compute')
-            response = requests.get(
-                f"{compute_url}/servers/{server_id}",
-                headers=headers
+            compute_url = self.compute_url
+            response = self._request(
+                'GET',
+                f"{compute_url}/servers/{server_id}"
             )
             
             if response.status_code == 200:
-                return response.json()['server']
+                return orjson.loads(response.content)['server']
             else:
                 logger.error(f"Failed to get server details: {response.status_code}")
                 return None
                 
-        except Exception as e:
+        except API_ERRORS as e:
             logger.error(f"Error getting server details: {str(e)}")
             return None
     
     def get_networks(self):
-        """Get list of all networks"""
+        """Get list of all networks (cached briefly, networks rarely change)"""
+        return self._cached('networks', self.NETWORKS_CACHE_TTL, self.fetch_networks)
+    
+    def fetch_networks(self):
+        """Fetch list of all networks from Neutron"""
         try:
-            headers = self.get_headers()
-            if not headers:
+            if not self.get_headers():
                 return None
                 
-            network_url = self.service_catalog.get('network')
+            network_url = self.network_url
             if not network_url:
-                logger.error("Network service not found in catalog")
                 return None
                 
-            response = requests.get(
+            response = self._request(
+                'GET',
                 f"{network_url}/v2.0/networks",
-                headers=headers
+                params={'fields': self.NETWORK_FIELDS}
             )
             
             if response.status_code == 200:
-                return response.json()['networks']
+                return orjson.loads(response.content)['networks']
             else:
                 logger.error(f"Failed to get networks: {response.status_code}")
                 return None
                 
-        except Exception as e:
+        except API_ERRORS as e:
             logger.error(f"Error getting networks: {str(e)}")
             return None
     
     def get_subnets(self):
         """Get list of all subnets"""
         try:
-            headers = self.get_headers()
-            if not headers:
+            if not self.get_headers():
                 return None
                 
-            network_url = self.service_catalog.get('network')
+            network_url = self.network_url
             if not network_url:
-                logger.error("Network service not found in catalog")
                 return None
                 
-            response = requests.get(
+            response = self._request(
+                'GET',
                 f"{network_url}/v2.0/subnets",
-                headers=headers
+                params={'fields': self.SUBNET_FIELDS}
             )
             
             if response.status_code == 200:
-                return response.json()['subnets']
+                return orjson.loads(response.content)['subnets']
             else:
                 logger.error(f"Failed to get subnets: {response.status_code}")
                 return None
                 
-        except Exception as e:
+        except API_ERRORS as e:
             logger.error(f"Error getting subnets: {str(e)}")
             return None
     
     def get_routers(self):
         """Get list of all routers"""
         try:
-            headers = self.get_headers()
-            if not headers:
+            if not self.get_headers():
                 return None
                 
-            network_url = self.service_catalog.get('network')
+            network_url = self.network_url
             if not network_url:
-                logger.error("Network service not found in catalog")
                 return None
                 
-            response = requests.get(
+            response = self._request(
+                'GET',
                 f"{network_url}/v2.0/routers",
-                headers=headers
+                params={'fields': self.ROUTER_FIELDS}
             )
             
             if response.status_code == 200:
-                return response.json()['routers']
+                return orjson.loads(response.content)['routers']
             else:
                 logger.error(f"Failed to get routers: {response.status_code}")
                 return None
                 
-        except Exception as e:
+        except API_ERRORS as e:
             logger.error(f"Error getting routers: {str(e)}")
             return None
     
     def get_floating_ips(self):
-        """Get list of floating IPs"""
+        """Get list of floating IPs (cached briefly, invalidated by IP changes)"""
+        cached = self._cached('floating_ips', self.FLOATING_IPS_CACHE_TTL, self.fetch_indexed_floating_ips)
+        return None if cached is None else cached[0]
+    
+    def get_floating_ip(self, floating_ip_id):
+        """Look up a floating IP by ID from the cached list ({} if unknown, None on API failure)"""
+        cached = self._cached('floating_ips', self.FLOATING_IPS_CACHE_TTL, self.fetch_indexed_floating_ips)
+        return None if cached is None else cached[1].get(floating_ip_id, {})
+    
+    def fetch_indexed_floating_ips(self):
+        """Fetch floating IPs with an ID index, cached as one entry so both expire together"""
+        floating_ips = self.fetch_floating_ips()
+        if floating_ips is None:
+            return None
+        return floating_ips, {ip['id']: ip for ip in floating_ips}
+    
+    def fetch_floating_ips(self):
+        """Fetch list of floating IPs from Neutron"""
         try:
-            headers = self.get_headers()
-            if not headers:
+            if not self.get_headers():
                 return None
                 
-            network_url = self.service_catalog.get('network')
+            network_url = self.network_url
             if not network_url:
-                logger.error("Network service not found in catalog")
                 return None
                 
-            response = requests.get(
+            response = self._request(
+                'GET',
                 f"{network_url}/v2.0/floatingips",
-                headers=headers
+                params={'fields': self.FLOATING_IP_FIELDS}
             )
             
             if response.status_code == 200:
-                return response.json()['floatingips']
+                return orjson.loads(response.content)['floatingips']
             else:
-                logger.error(f"Failed to get floating IPs: {response.status_code} - {response.text}")
+                logger.error("Failed to get floating IPs: %s - %s", response.status_code, ErrorBody(response))
                 return None
                 
-        except Exception as e:
+        except API_ERRORS as e:
             logger.error(f"Error getting floating IPs: {str(e)}")
             return None
     
     def get_ports(self):
         """Get list of all ports"""
         try:
-            headers = self.get_headers()
-            if not headers:
+            if not self.get_headers():
                 return None
                 
-            network_url = self.service_catalog.get('network')
+            network_url = self.network_url
             if not network_url:
-                logger.error("Network service not found in catalog")
                 return None
                 
-            response = requests.get(
-                f"{network_url}/v2.0/ports",
-                headers=headers
+            response = self._request(
+                'GET',
+                f"{network_url}/v2.0/ports"
             )
             
             if response.status_code == 200:
-                return response.json()['ports']
+                return orjson.loads(response.content)['ports']
             else:
-                logger.error(f"Failed to get ports: {response.status_code} - {response.text}")
+                logger.error("Failed to get ports: %s - %s", response.status_code, ErrorBody(response))
                 return None
                 
-        except Exception as e:
+        except API_ERRORS as e:
             logger.error(f"Error getting ports: {str(e)}")
             return None
     
@@ -334,12 +614,16 @@ class OpenStackAPI:
             
             return public_networks
             
-        except Exception as e:
+        except API_ERRORS as e:
             logger.error(f"Error getting public networks: {str(e)}")
             return []
     
     def get_public_network_id(self):
-        """Get the ID of a public network (prefer public-167 or public-431)"""
+        """Get the ID of a public network (cached, it almost never changes)"""
+        return self._cached('public_network_id', self.PUBLIC_NETWORK_CACHE_TTL, self.find_public_network_id)
+    
+    def find_public_network_id(self):
+        """Find the ID of a public network (prefer public-167 or public-431)"""
         try:
             public_networks = self.get_public_networks()
             if not public_networks:
@@ -358,7 +642,7 @@ class OpenStackAPI:
             logger.info(f"Using public network: {network['name']}")
             return network['id']
             
-        except Exception as e:
+        except API_ERRORS as e:
             logger.error(f"Error getting public network ID: {str(e)}")
             return None
     
@@ -397,20 +681,18 @@ class OpenStackAPI:
             
             return list(connected_networks)
             
-        except Exception as e:
+        except API_ERRORS as e:
             logger.error(f"Error finding networks with external gateway: {str(e)}")
             return []
     
     def create_network(self, name, cidr="192.168.100.0/24"):
         """Create a new private network with subnet"""
         try:
-            headers = self.get_headers()
-            if not headers:
+            if not self.get_headers():
                 return None
                 
-            network_url = self.service_catalog.get('network')
+            network_url = self.network_url
             if not network_url:
-                logger.error("Network service not found in catalog")
                 return None
             
             # Create network
@@ -421,18 +703,19 @@ class OpenStackAPI:
                 }
             }
             
-            response = requests.post(
+            response = self._request(
+                'POST',
                 f"{network_url}/v2.0/networks",
-                headers=headers,
-                json=network_data
+                data=orjson.dumps(network_data)
             )
             
             if response.status_code not in [201, 200]:
-                logger.error(f"Failed to create network: {response.status_code} - {response.text}")
+                logger.error("Failed to create network: %s - %s", response.status_code, ErrorBody(response))
                 return None
             
-            network = response.json()['network']
+            network = orjson.loads(response.content)['network']
             logger.info(f"Created network: {network['name']} ({network['id']})")
+            self.invalidate_cache('networks')
             
             # Create subnet
             subnet_data = {
@@ -445,35 +728,33 @@ class OpenStackAPI:
                 }
             }
             
-            response = requests.post(
+            response = self._request(
+                'POST',
                 f"{network_url}/v2.0/subnets",
-                headers=headers,
-                json=subnet_data
+                data=orjson.dumps(subnet_data)
             )
             
             if response.status_code not in [201, 200]:
-                logger.error(f"Failed to create subnet: {response.status_code} - {response.text}")
+                logger.error("Failed to create subnet: %s - %s", response.status_code, ErrorBody(response))
                 return network  # Return network even if subnet creation fails
             
-            subnet = response.json()['subnet']
+            subnet = orjson.loads(response.content)['subnet']
             logger.info(f"Created subnet: {subnet['name']} ({subnet['id']})")
             
             return network
             
-        except Exception as e:
+        except API_ERRORS as e:
             logger.error(f"Error creating network: {str(e)}")
             return None
     
     def allocate_floating_ip(self, floating_network_id=None):
         """Allocate a new floating IP"""
         try:
-            headers = self.get_headers()
-            if not headers:
+            if not self.get_headers():
                 return None
                 
-            network_url = self.service_catalog.get('network')
+            network_url = self.network_url
             if not network_url:
-                logger.error("Network service not found in catalog")
                 return None
             
             # If no network ID provided, try to get a public network
@@ -489,34 +770,33 @@ class OpenStackAPI:
                 }
             }
             
-            response = requests.post(
+            response = self._request(
+                'POST',
                 f"{network_url}/v2.0/floatingips",
-                headers=headers,
-                json=floatingip_data
+                data=orjson.dumps(floatingip_data)
             )
             
             if response.status_code in [201, 200]:
-                result = response.json()['floatingip']
+                result = orjson.loads(response.content)['floatingip']
                 logger.info(f"Allocated floating IP: {result['floating_ip_address']}")
+                self.invalidate_cache('floating_ips')
                 return result
             else:
-                logger.error(f"Failed to allocate floating IP: {response.status_code} - {response.text}")
+                logger.error("Failed to allocate floating IP: %s - %s", response.status_code, ErrorBody(response))
                 return None
                 
-        except Exception as e:
+        except API_ERRORS as e:
             logger.error(f"Error allocating floating IP: {str(e)}")
             return None
     
     def associate_floating_ip(self, floating_ip_id, port_id):
         """Associate a floating IP with a port"""
         try:
-            headers = self.get_headers()
-            if not headers:
+            if not self.get_headers():
                 return None
                 
-            network_url = self.service_catalog.get('network')
+            network_url = self.network_url
             if not network_url:
-                logger.error("Network service not found in catalog")
                 return None
             
             update_data = {
@@ -525,34 +805,33 @@ class OpenStackAPI:
                 }
             }
             
-            response = requests.put(
+            response = self._request(
+                'PUT',
                 f"{network_url}/v2.0/floatingips/{floating_ip_id}",
-                headers=headers,
-                json=update_data
+                data=orjson.dumps(update_data)
             )
             
             if response.status_code in [200, 202]:
-                result = response.json()['floatingip']
+                result = orjson.loads(response.content)['floatingip']
                 logger.info(f"Associated floating IP {result['floating_ip_address']} with port {port_id}")
+                self.invalidate_cache('servers', 'floating_ips')
                 return result
             else:
-                logger.error(f"Failed to associate floating IP: {response.status_code} - {response.text}")
+                logger.error("Failed to associate floating IP: %s - %s", response.status_code, ErrorBody(response))
                 return None
                 
-        except Exception as e:
+        except API_ERRORS as e:
             logger.error(f"Error associating floating IP: {str(e)}")
             return None
     
     def disassociate_floating_ip(self, floating_ip_id):
         """Disassociate a floating IP from any port"""
         try:
-            headers = self.get_headers()
-            if not headers:
+            if not self.get_headers():
                 return None
                 
-            network_url = self.service_catalog.get('network')
+            network_url = self.network_url
             if not network_url:
-                logger.error("Network service not found in catalog")
                 return None
             
             update_data = {
@@ -561,91 +840,91 @@ class OpenStackAPI:
                 }
             }
             
-            response = requests.put(
+            response = self._request(
+                'PUT',
                 f"{network_url}/v2.0/floatingips/{floating_ip_id}",
-                headers=headers,
-                json=update_data
+                data=orjson.dumps(update_data)
             )
             
             if response.status_code in [200, 202]:
-                return response.json()['floatingip']
+                self.invalidate_cache('servers', 'floating_ips')
+                return orjson.loads(response.content)['floatingip']
             else:
-                logger.error(f"Failed to disassociate floating IP: {response.status_code} - {response.text}")
+                logger.error("Failed to disassociate floating IP: %s - %s", response.status_code, ErrorBody(response))
                 return None
                 
-        except Exception as e:
+        except API_ERRORS as e:
             logger.error(f"Error disassociating floating IP: {str(e)}")
             return None
     
     def delete_floating_ip(self, floating_ip_id):
         """Delete a floating IP"""
         try:
-            headers = self.get_headers()
-            if not headers:
+            if not self.get_headers():
                 return False
                 
-            network_url = self.service_catalog.get('network')
+            network_url = self.network_url
             if not network_url:
-                logger.error("Network service not found in catalog")
                 return False
             
-            response = requests.delete(
-                f"{network_url}/v2.0/floatingips/{floating_ip_id}",
-                headers=headers
+            response = self._request(
+                'DELETE',
+                f"{network_url}/v2.0/floatingips/{floating_ip_id}"
             )
             
             if response.status_code in [204, 202]:
+                self.invalidate_cache('floating_ips')
                 return True
             else:
-                logger.error(f"Failed to delete floating IP: {response.status_code} - {response.text}")
+                logger.error("Failed to delete floating IP: %s - %s", response.status_code, ErrorBody(response))
                 return False
                 
-        except Exception as e:
+        except API_ERRORS as e:
             logger.error(f"Error deleting floating IP: {str(e)}")
             return False
     
     def get_server_interfaces(self, server_id):
         """Get all network interfaces attached to a server"""
         try:
-            headers = self.get_headers()
-            if not headers:
+            if not self.get_headers():
                 return None
                 
-            compute_url = self.service_catalog.get('compute')
+            compute_url = self.compute_url
             if not compute_url:
-                logger.error("Compute service not found in catalog")
                 return None
             
-            response = requests.get(
-                f"{compute_url}/servers/{server_id}/os-interface",
-                headers=headers
+            response = self._request(
+                'GET',
+                f"{compute_url}/servers/{server_id}/os-interface"
             )
             
             if response.status_code == 200:
-                interfaces = response.json()['interfaceAttachments']
+                interfaces = orjson.loads(response.content)['interfaceAttachments']
                 logger.info(f"Found {len(interfaces)} interfaces for server {server_id}")
                 for interface in interfaces:
                     logger.info(f"Interface {interface['port_id']}: fixed_ips={interface.get('fixed_ips', [])}")
                 return interfaces
             else:
-                logger.error(f"Failed to get server interfaces: {response.status_code} - {response.text}")
+                logger.error("Failed to get server interfaces: %s - %s", response.status_code, ErrorBody(response))
                 return None
                 
-        except Exception as e:
+        except API_ERRORS as e:
             logger.error(f"Error getting server interfaces: {str(e)}")
             return None
     
-    def get_suitable_interface_for_floating_ip(self, server_id):
+    def get_suitable_interface_for_floating_ip(self, server_id, interfaces=None, external_networks=None):
         """Get a suitable interface for floating IP association (must have external gateway access)"""
         try:
-            # Get server interfaces
-            interfaces = self.get_server_interfaces(server_id)
+            # Get server interfaces unless the caller already fetched them
+            if interfaces is None:
+                interfaces = self.get_server_interfaces(server_id)
             if not interfaces:
                 logger.warning(f"No interfaces found for server {server_id}")
                 return None
             
             # Get networks with external gateway access
-            external_networks = self.find_networks_with_external_gateway()
+            if external_networks is None:
+                external_networks = self.find_networks_with_external_gateway()
             logger.info(f"Found {len(external_networks)} networks with external gateway access")
             
             # Find an interface on a network with external access and IPv4 addresses
@@ -683,20 +962,18 @@ class OpenStackAPI:
             logger.warning(f"No suitable interfaces found for server {server_id}")
             return None
             
-        except Exception as e:
+        except API_ERRORS as e:
             logger.error(f"Error finding suitable interface: {str(e)}")
             return None
     
     def attach_interface(self, server_id, network_id, port_id=None, fixed_ips=None):
         """Attach a network interface to a server"""
         try:
-            headers = self.get_headers()
-            if not headers:
+            if not self.get_headers():
                 return None
                 
-            compute_url = self.service_catalog.get('compute')
+            compute_url = self.compute_url
             if not compute_url:
-                logger.error("Compute service not found in catalog")
                 return None
             
             interface_data = {
@@ -713,160 +990,117 @@ class OpenStackAPI:
             
             logger.info(f"Attaching interface to server {server_id} on network {network_id}")
             
-            response = requests.post(
+            response = self._request(
+                'POST',
                 f"{compute_url}/servers/{server_id}/os-interface",
-                headers=headers,
-                json=interface_data
+                data=orjson.dumps(interface_data)
             )
             
             if response.status_code in [200, 202]:
-                result = response.json()['interfaceAttachment']
+                self.invalidate_cache('servers')
+                result = orjson.loads(response.content)['interfaceAttachment']
                 logger.info(f"Successfully attached interface {result['port_id']} to server {server_id}")
                 return result
             else:
-                logger.error(f"Failed to attach interface: {response.status_code} - {response.text}")
+                logger.error("Failed to attach interface: %s - %s", response.status_code, ErrorBody(response))
                 return None
                 
-        except Exception as e:
+        except API_ERRORS as e:
             logger.error(f"Error attaching interface: {str(e)}")
             return None
     
     def detach_interface(self, server_id, port_id):
         """Detach a network interface from a server"""
         try:
-            headers = self.get_headers()
-            if not headers:
+            if not self.get_headers():
                 return False
                 
-            compute_url = self.service_catalog.get('compute')
+            compute_url = self.compute_url
             if not compute_url:
-                logger.error("Compute service not found in catalog")
                 return False
             
-            response = requests.delete(
-                f"{compute_url}/servers/{server_id}/os-interface/{port_id}",
-                headers=headers
+            response = self._request(
+                'DELETE',
+                f"{compute_url}/servers/{server_id}/os-interface/{port_id}"
             )
             
             if response.status_code in [202, 204]:
+                self.invalidate_cache('servers')
                 logger.info(f"Successfully detached interface {port_id} from server {server_id}")
                 return True
             else:
-                logger.error(f"Failed to detach interface: {response.status_code} - {response.text}")
+                logger.error("Failed to detach interface: %s - %s", response.status_code, ErrorBody(response))
                 return False
                 
-        except Exception as e:
+        except API_ERRORS as e:
             logger.error(f"Error detaching interface: {str(e)}")
             return False
     
     def add_fixed_ip_to_interface(self, server_id, port_id, subnet_id):
         """Add a fixed IP to an existing interface (same MAC address)"""
-        try:
-            headers = self.get_headers()
-            if not headers:
-                return False
-                
-            network_url = self.service_catalog.get('network')
-            if not network_url:
-                logger.error("Network service not found in catalog")
-                return False
-            
-            # Get current port details
-            response = requests.get(
-                f"{network_url}/v2.0/ports/{port_id}",
-                headers=headers
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"Failed to get port details: {response.status_code} - {response.text}")
-                return False
-            
-            port = response.json()['port']
-            current_fixed_ips = port.get('fixed_ips', [])
-            
-            # Add new fixed IP to the same port
-            new_fixed_ips = current_fixed_ips + [{"subnet_id": subnet_id}]
-            
-            update_data = {
-                "port": {
-                    "fixed_ips": new_fixed_ips
-                }
-            }
-            
-            logger.info(f"Adding fixed IP to port {port_id} on subnet {subnet_id}")
-            
-            response = requests.put(
-                f"{network_url}/v2.0/ports/{port_id}",
-                headers=headers,
-                json=update_data
-            )
-            
-            if response.status_code in [200, 202]:
-                logger.info(f"Successfully added fixed IP to port {port_id}")
-                return True
-            else:
-                logger.error(f"Failed to add fixed IP to port: {response.status_code} - {response.text}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"Error adding fixed IP to interface: {str(e)}")
-            return False
+        logger.info(f"Adding fixed IP to port {port_id} on subnet {subnet_id}")
+        return self.update_port_fixed_ips(port_id, add_subnets=[subnet_id])
     
     def remove_fixed_ip_from_interface(self, server_id, port_id, ip_address):
         """Remove a specific fixed IP from an interface"""
+        logger.info(f"Removing fixed IP {ip_address} from port {port_id}")
+        return self.update_port_fixed_ips(port_id, remove_ips=[ip_address])
+    
+    def update_port_fixed_ips(self, port_id, add_subnets=(), remove_ips=()):
+        """Add and remove any number of fixed IPs on a port with a single port update"""
         try:
-            headers = self.get_headers()
-            if not headers:
+            if not self.get_headers():
                 return False
                 
-            network_url = self.service_catalog.get('network')
+            network_url = self.network_url
             if not network_url:
-                logger.error("Network service not found in catalog")
                 return False
             
-            # Get current port details
-            response = requests.get(
+            # Get current fixed IPs; Neutron replaces the whole list on update
+            response = self._request(
+                'GET',
                 f"{network_url}/v2.0/ports/{port_id}",
-                headers=headers
+                params={'fields': 'fixed_ips'}
             )
             
             if response.status_code != 200:
-                logger.error(f"Failed to get port details: {response.status_code} - {response.text}")
+                logger.error("Failed to get port details: %s - %s", response.status_code, ErrorBody(response))
                 return False
             
-            port = response.json()['port']
-            current_fixed_ips = port.get('fixed_ips', [])
+            current_fixed_ips = orjson.loads(response.content)['port'].get('fixed_ips', [])
             
-            # Remove the specific IP address
-            new_fixed_ips = [ip for ip in current_fixed_ips if ip.get('ip_address') != ip_address]
+            # Drop the removed addresses, then request one new address per subnet
+            remove_ips = set(remove_ips)
+            new_fixed_ips = [ip for ip in current_fixed_ips if ip.get('ip_address') not in remove_ips]
             
-            if len(new_fixed_ips) == len(current_fixed_ips):
-                logger.warning(f"IP address {ip_address} not found on port {port_id}")
+            if len(current_fixed_ips) - len(new_fixed_ips) != len(remove_ips):
+                logger.warning(f"Not all of {sorted(remove_ips)} found on port {port_id}")
                 return False
             
+            new_fixed_ips.extend({"subnet_id": subnet_id} for subnet_id in add_subnets)
+            
             update_data = {
                 "port": {
                     "fixed_ips": new_fixed_ips
                 }
             }
             
-            logger.info(f"Removing fixed IP {ip_address} from port {port_id}")
-            
-            response = requests.put(
+            response = self._request(
+                'PUT',
                 f"{network_url}/v2.0/ports/{port_id}",
-                headers=headers,
-                json=update_data
+                data=orjson.dumps(update_data)
             )
             
             if response.status_code in [200, 202]:
-                logger.info(f"Successfully removed fixed IP {ip_address} from port {port_id}")
+                self.invalidate_cache('servers')
+                logger.info(f"Updated fixed IPs on port {port_id}: +{len(add_subnets)} -{len(remove_ips)}")
                 return True
             else:
-                logger.error(f"Failed to remove fixed IP from port: {response.status_code} - {response.text}")
+                logger.error("Failed to update fixed IPs on port: %s - %s", response.status_code, ErrorBody(response))
                 return False
                 
-        except Exception as e:
-            logger.error(f"Error removing fixed IP from interface: {str(e)}")
+        except API_ERRORS as e:
+            logger.error(f"Error updating fixed IPs on port: {str(e)}")
             return False
     
     def get_networks_for_fixed_ip(self):
@@ -878,16 +1112,8 @@ class OpenStackAPI:
                 return []
             
             # Show all networks except external ones
-            available_networks = []
-            for network in networks:
-                # Skip external networks for fixed IPs
-                if network.get('router:external', False):
-                    logger.info(f"Skipping external network: {network['name']}")
-                    continue
-                
-                # Include all other networks
-                available_networks.append(network)
-                logger.info(f"Available network for fixed IP: {network['name']} ({network['id']})")
+            available_networks = [network for network in networks if not network.get('router:external', False)]
+            logger.debug(f"{len(available_networks)} of {len(networks)} networks available for fixed IPs")
             
             if not available_networks:
                 # If no networks found, show all networks
@@ -896,184 +1122,295 @@ class OpenStackAPI:
             
             return available_networks
             
-        except Exception as e:
+        except API_ERRORS as e:
             logger.error(f"Error getting networks for fixed IP: {str(e)}")
             return []
 
 # Initialize OpenStack API
 openstack = OpenStackAPI()
+atexit.register(openstack.close)
 
-async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Start command handler"""
-    # Check authorization
-    if not await check_authorization(update, context):
-        return
-    
-    # Clear any stored data
-    context.user_data.clear()
-    
-    keyboard = [
-        [InlineKeyboardButton("📊 List Servers", callback_data='list_servers')],
-        [InlineKeyboardButton("🌐 List Networks", callback_data='list_networks')],
-        [InlineKeyboardButton("🔗 Floating IPs", callback_data='list_floating_ips')],
-        [InlineKeyboardButton("➕ Add Floating IP", callback_data='add_floating_ip')],
-        [InlineKeyboardButton("🔧 Manage Fixed IPs", callback_data='manage_fixed_ips')],
-        [InlineKeyboardButton("🛠️ Create Private Network", callback_data='create_network')],
-        [InlineKeyboardButton("ℹ️ Help", callback_data='help')]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    welcome_text = """
+# Static message texts, built once at import
+WELCOME_TEXT = """
 🤖 *OpenStack Management Bot*
 
 Welcome! I can help you monitor and manage your OpenStack VPS instances.
 
 Choose an option from the menu below:
-    """
+"""
+
+HELP_TEXT = """
+ℹ️ *OpenStack Bot Help*
+
+*Available Commands:*
+• `/start` - Show main menu
+• `/status` - Check bot status
+
+*Features:*
+• 📊 View all your VPS servers
+• 🌐 List available networks
+• 🔗 Monitor floating IP addresses
+• ➕ Add floating IPs to servers
+• 🔧 Manage fixed IPs on servers
+• 🛠️ Create private networks
+• 📋 Get detailed server information
+
+*Floating IP Management:*
+• Allocate new floating IPs from public-167/public-431
+• Associate IPs with servers (requires external gateway access)
+• Disassociate IPs from servers
+• Delete floating IPs
+
+*Fixed IP Management:*
+• Add fixed IPs to existing interfaces (same MAC address)
+• Remove fixed IPs from interfaces
+• View current IP assignments by interface
+
+*Network Requirements:*
+• Floating IPs require servers on networks with external gateway
+• Fixed IPs are added to existing interfaces, not new ones
+• Private networks can be created for isolation
+
+*Status Indicators:*
+• 🟢 Active/Available
+• 🔴 Error/Down
+• 🟡 Building/Transitioning
+• 🌍 External network
+• 🏠 Internal network
+• 📎 Attached floating IP
+• 🔓 Unattached floating IP
+
+*Need help?* Contact your system administrator.
+"""
+
+FIXED_IP_MENU_TEXT = (
+    "🔧 *Fixed IP Management*\n\n"
+    "Select a server to manage its fixed IPs:\n"
+    "Fixed IPs are added to existing interfaces (same MAC address)."
+)
+
+# Message templates filled with .format(); values must already be Markdown-escaped
+FIXED_IP_HEADER_TEMPLATE = "🔧 *Fixed IPs for {name}*\n\nCurrent Interfaces and Fixed IPs:\n"
+
+CONFIRM_ADD_FIXED_IP_TEMPLATE = (
+    "⚠️ *Confirm Add Fixed IP*\n\n"
+    "Add a fixed IP to:\n"
+    "**Server:** `{server}`\n"
+    "**Interface:** `{port}...`\n"
+    "**Network:** `{network}`\n"
+    "**Subnet:** `{cidr}`\n\n"
+    "This will add an additional IP address to the existing interface."
+)
+
+CONFIRM_REMOVE_FIXED_IP_TEMPLATE = (
+    "⚠️ *Confirm Remove Fixed IP*\n\n"
+    "Remove fixed IP:\n"
+    "**IP Address:** `{ip}`\n"
+    "**Server:** `{server}`\n"
+    "**Interface:** `{port}...`\n\n"
+    "**Warning:** This action cannot be undone and may affect:\n"
+    "• Associated floating IPs\n"
+    "• Network connectivity\n"
+    "• Running services"
+)
+
+# Status indicators for servers, floating IPs and networks; callers pick the fallback
+STATUS_EMOJI = {'ACTIVE': "🟢", 'ERROR': "🔴"}
+
+# Read-only default for user_data lookup maps that have not been stored yet
+EMPTY_MAPPING = MappingProxyType({})
+
+# Seconds a second tap on the same button of the same message is ignored; longer for actions
+CALLBACK_DEBOUNCE = 2
+ACTION_CALLBACK_DEBOUNCE = 5
+ACTION_CALLBACK_PREFIXES = frozenset({
+    'allocate_floating_ip', 'confirm_associate', 'confirm_disassociate', 'confirm_delete',
+    'confirm_add_fixed_ip', 'confirm_remove_fixed_ip'
+})
+
+# Static keyboards, built once at import
+MAIN_MENU_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("📊 List Servers", callback_data='list_servers')],
+    [InlineKeyboardButton("🌐 List Networks", callback_data='list_networks')],
+    [InlineKeyboardButton("🔗 Floating IPs", callback_data='list_floating_ips')],
+    [InlineKeyboardButton("➕ Add Floating IP", callback_data='add_floating_ip')],
+    [InlineKeyboardButton("🔧 Manage Fixed IPs", callback_data='manage_fixed_ips')],
+    [InlineKeyboardButton("🛠️ Create Private Network", callback_data='create_network')],
+    [InlineKeyboardButton("ℹ️ Help", callback_data='help')]
+])
+
+BACK_TO_MAIN_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔙 Back to Main", callback_data='back_to_main')]
+])
+
+CREATE_NETWORK_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("✅ Create Network", callback_data='confirm_create_network')],
+    [InlineKeyboardButton("❌ Cancel", callback_data='back_to_main')]
+])
+
+NO_FLOATING_IPS_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("➕ Allocate New Floating IP", callback_data='allocate_floating_ip')],
+    [InlineKeyboardButton("🔙 Back to Main", callback_data='back_to_main')]
+])
+
+FLOATING_IP_MENU_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("➕ Allocate New IP", callback_data='allocate_floating_ip')],
+    [InlineKeyboardButton("🔄 Associate IP with Server", callback_data='associate_floating_ip')],
+    [InlineKeyboardButton("🔙 Back to Main", callback_data='back_to_main')]
+])
+
+ALLOCATED_IP_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔄 Associate with Server", callback_data='associate_floating_ip')],
+    [InlineKeyboardButton("🔙 Back to Floating IPs", callback_data='list_floating_ips')]
+])
+
+NO_FREE_FLOATING_IPS_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("➕ Allocate New IP", callback_data='allocate_floating_ip')],
+    [InlineKeyboardButton("🔙 Back", callback_data='back_to_floating_ips')]
+])
+
+FLOATING_IP_DONE_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔙 Back to Floating IPs", callback_data='list_floating_ips')],
+    [InlineKeyboardButton("🔙 Back to Main", callback_data='back_to_main')]
+])
+
+@authorized
+async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Start command handler"""
+    # Clear any stored data
+    context.user_data.clear()
     
     await update.message.reply_text(
-        welcome_text,
+        WELCOME_TEXT,
         parse_mode='Markdown',
-        reply_markup=reply_markup
+        reply_markup=MAIN_MENU_MARKUP
     )
 
+@authorized
 async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle button callbacks"""
-    # Check authorization
-    user_id = update.effective_user.id
-    if not is_authorized(user_id):
-        query = update.callback_query
-        await query.answer()
-        await query.edit_message_text(
-            "❌ You are not authorized to use this bot.\n\n"
-            "Please contact @MmdHsn21 for access."
-        )
-        return
-    
     query = update.callback_query
     await query.answer()
     
     try:
         # Fix: Handle potential invalid callback data
         callback_data = query.data
+        
+        # Double taps would rerun the handler and its API calls for the same result
+        if is_repeated_callback(context, query):
+            logger.debug(f"Ignoring repeated callback data: {callback_data}")
+            return
+        
         logger.info(f"Processing callback data: {callback_data}")
         
-        if callback_data == 'list_servers':
-            await list_servers(query, context, page=0)
-        elif callback_data.startswith('list_servers_page_'):
-            page = int(callback_data.split('_')[-1])
-            await list_servers(query, context, page=page)
-        elif callback_data == 'list_networks':
-            await list_networks(query)
-        elif callback_data == 'list_floating_ips':
-            await list_floating_ips(query)
-        elif callback_data == 'add_floating_ip':
-            await add_floating_ip_menu(query, context)
-        elif callback_data == 'allocate_floating_ip':
-            await allocate_floating_ip(query)
-        elif callback_data == 'associate_floating_ip':
-            await select_server_for_ip(query, context)
-        elif callback_data == 'create_network':
-            await create_network_menu(query, context)
-        elif callback_data.startswith('select_server|') and not callback_data.startswith('select_server_for_fixed_ip|'):
-            # Handle floating IP server selection - using index
-            server_index = callback_data.replace('select_server|', '')
-            await select_floating_ip(query, context, server_index)
-        elif callback_data.startswith('select_ip|'):
-            # Format: select_ip|{ip_index}
-            ip_index = callback_data.replace('select_ip|', '')
-            await confirm_associate_ip(query, context, ip_index)
-        elif callback_data.startswith('confirm_associate|'):
-            # Format: confirm_associate|{ip_index}
-            ip_index = callback_data.replace('confirm_associate|', '')
-            await do_associate_ip(query, context, ip_index)
-        elif callback_data.startswith('disassociate_ip|'):
-            ip_id = callback_data.replace('disassociate_ip|', '')
-            await confirm_disassociate_ip(query, context, ip_id)
-        elif callback_data.startswith('confirm_disassociate|'):
-            ip_id = callback_data.replace('confirm_disassociate|', '')
-            await do_disassociate_ip(query, ip_id)
-        elif callback_data.startswith('delete_ip|'):
-            ip_id = callback_data.replace('delete_ip|', '')
-            await confirm_delete_ip(query, context, ip_id)
-        elif callback_data.startswith('confirm_delete|'):
-            ip_id = callback_data.replace('confirm_delete|', '')
-            await do_delete_ip(query, ip_id)
-        # Fixed IP management handlers
-        elif callback_data == 'manage_fixed_ips':
-            await manage_fixed_ips(query, context)
-        elif callback_data.startswith('select_server_for_fixed_ip|'):
-            server_index = callback_data.replace('select_server_for_fixed_ip|', '')
-            await manage_server_fixed_ips(query, context, server_index)
-        elif callback_data.startswith('add_fixed_ip|'):
-            server_index = callback_data.replace('add_fixed_ip|', '')
-            await select_interface_for_fixed_ip(query, context, server_index)
-        elif callback_data.startswith('select_interface|'):
-            # Format: select_interface|{interface_index}
-            interface_index = callback_data.replace('select_interface|', '')
-            await select_network_for_fixed_ip(query, context, interface_index)
-        elif callback_data.startswith('select_network|'):
-            # Format: select_network|{network_index}
-            network_index = callback_data.replace('select_network|', '')
-            await confirm_add_fixed_ip(query, context, network_index)
-        elif callback_data.startswith('confirm_add_fixed_ip|'):
-            # Format: confirm_add_fixed_ip|{network_index}
-            network_index = callback_data.replace('confirm_add_fixed_ip|', '')
-            await do_add_fixed_ip(query, context, network_index)
-        elif callback_data.startswith('remove_fixed_ip|'):
-            # Format: remove_fixed_ip|{ip_index}
-            ip_index = callback_data.replace('remove_fixed_ip|', '')
-            # Get the IP address from the stored fixed IPs
-            fixed_ips = context.user_data.get('fixed_ips', [])
-            if ip_index.isdigit() and int(ip_index) < len(fixed_ips):
-                ip_data = fixed_ips[int(ip_index)]
-                # Store for confirmation
-                context.user_data['confirm_remove_ip'] = ip_data
-                await confirm_remove_fixed_ip(query, context, ip_data)
-            else:
-                await query.edit_message_text("❌ Invalid IP selection. Please try again.")
-        elif callback_data.startswith('confirm_remove_fixed_ip|'):
-            # Format: confirm_remove_fixed_ip|{ip_index}
-            ip_index = callback_data.replace('confirm_remove_fixed_ip|', '')
-            await do_remove_fixed_ip(query, context, ip_index)
-        elif callback_data == 'help':
-            await show_help(query)
-        elif callback_data.startswith('server|'):
-            server_id = callback_data.replace('server|', '')
-            await show_server_details(query, context, server_id)
-        elif callback_data == 'back_to_main':
-            await back_to_main(query)
-        elif callback_data == 'back_to_servers':
-            await list_servers(query, context, page=0)
-        elif callback_data == 'back_to_floating_ips':
-            await list_floating_ips(query)
-        elif callback_data == 'back_to_fixed_ips':
-            await manage_fixed_ips(query, context)
-        elif callback_data == 'cancel_operation':
-            await query.edit_message_text("❌ Operation cancelled.")
-            await asyncio.sleep(2)
-            await back_to_main(query)
-        else:
+        # Only a view rendered by the chat's previous callback may be skipped as unchanged
+        if context.chat_data is not None:
+            context.chat_data['previous_view'] = context.chat_data.pop('rendered_view', None)
+        
+        route = CALLBACK_ROUTES.get(callback_data)
+        args = ()
+        if not route:
+            # Parameterized callbacks use the "prefix|argument" format
+            prefix, separator, argument = callback_data.partition('|')
+            route = CALLBACK_PREFIX_ROUTES.get(prefix) if separator else None
+            args = (argument,)
+        
+        if not route:
             logger.warning(f"Unknown callback data: {callback_data}")
-            await query.edit_message_text("❌ Invalid operation. Please try again.")
-            await asyncio.sleep(2)
-            await back_to_main(query)
-            
-    except Exception as e:
-        logger.error(f"Error in button_handler: {str(e)}")
-        await query.edit_message_text("❌ An error occurred. Please try again later.")
-        await asyncio.sleep(2)
-        await back_to_main(query)
+            await back_to_main(query, "❌ Invalid operation. Please try again.")
+            return
+        
+        try:
+            await route(query, context, *args)
+        finally:
+            # Taps queued behind a slow handler by the per-chat lock are still repeats
+            restart_callback_debounce(context, query)
+            
+    except Exception:
+        logger.exception("Error in button_handler")
+        await back_to_main(query, "❌ An error occurred. Please try again later.")
+
+# Legacy Markdown can't escape inside an entity: close it, emit the escaped char, reopen it
+def md_bold(text):
+    """Make a value safe to place inside a *bold* entity"""
+    return text.replace('*', '*\\**')
+
+def md_code(text):
+    """Make a value safe to place inside a `code` entity"""
+    return text.replace('`', '`\\``')
+
+@functools.lru_cache(maxsize=256)
+def pagination_buttons(page, total_pages, callback_prefix):
+    """Previous/Next buttons for a paginated list (buttons are immutable, so rows are shared)"""
+    row = []
+    if page > 0:
+        row.append(InlineKeyboardButton("⬅️ Previous", callback_data=f'{callback_prefix}|{page-1}'))
+    if page < total_pages - 1:
+        row.append(InlineKeyboardButton("Next ➡️", callback_data=f'{callback_prefix}|{page+1}'))
+    return tuple(row)
+
+def callback_debounce_key(query):
+    """Identify a tap by the message it was made on and the button's callback data"""
+    return (query.message.message_id if query.message else query.inline_message_id, query.data)
 
-async def list_servers(query, context, page=0):
+def callback_debounce_window(callback_data):
+    """Seconds a repeat of this callback is ignored"""
+    prefix = callback_data.partition('|')[0]
+    return ACTION_CALLBACK_DEBOUNCE if prefix in ACTION_CALLBACK_PREFIXES else CALLBACK_DEBOUNCE
+
+def is_repeated_callback(context, query):
+    """Check whether a callback repeats the user's previous tap within the debounce window"""
+    now = time.monotonic()
+    key = callback_debounce_key(query)
+    last = context.user_data.get('last_callback')
+    if last and last[0] == key and now < last[1]:
+        return True
+    
+    context.user_data['last_callback'] = (key, now + callback_debounce_window(query.data))
+    return False
+
+def restart_callback_debounce(context, query):
+    """Restart the debounce window once the tap's handler has finished"""
+    key = callback_debounce_key(query)
+    last = context.user_data.get('last_callback')
+    if last and last[0] == key:
+        context.user_data['last_callback'] = (key, time.monotonic() + callback_debounce_window(query.data))
+
+async def show_view(query, context, text, reply_markup):
+    """Edit the message into a view, skipping the edit if it already shows exactly that view"""
+    if query.message is None:
+        await query.edit_message_text(text, parse_mode='Markdown', reply_markup=reply_markup)
+        return
+    
+    # Keyed by message and kept per chat, since any authorized user in the chat can edit the message
+    view = ((query.message.chat_id, query.message.message_id), text, reply_markup)
+    if context.chat_data.get('previous_view') != view:
+        await query.edit_message_text(text, parse_mode='Markdown', reply_markup=reply_markup)
+    context.chat_data['rendered_view'] = view
+
+def store_servers(context, servers):
+    """Remember a server list and its ID/index lookups for later callbacks"""
+    context.user_data['servers'] = servers
+    context.user_data['servers_by_id'] = {server['id']: server for server in servers}
+    context.user_data['server_map'] = {str(i): server['id'] for i, server in enumerate(servers)}
+    context.user_data['server_index_by_id'] = {server['id']: str(i) for i, server in enumerate(servers)}
+
+async def resolve_server(context, server_id):
+    """Return a server from the stored list, fetching its details only on a miss"""
+    server = context.user_data.get('servers_by_id', EMPTY_MAPPING).get(server_id)
+    if server is None and server_id:
+        server = await asyncio.to_thread(openstack.get_server_details, server_id)
+    return server
+
+async def list_servers(query, context, page=0, refresh=False):
     """List all servers with pagination"""
     try:
-        # Clear previous server data to ensure fresh data
-        if 'servers' in context.user_data:
-            del context.user_data['servers']
-            
-        # Get servers
-        servers = openstack.get_servers()
+        # Opening the list from the menu fetches fresh data; page flips reuse the cached list
+        if refresh:
+            openstack.invalidate_cache('servers')
+        
+        servers = await asyncio.to_thread(openstack.get_servers)
+        
         if servers is None:  # Fix: Check for None specifically
             await query.edit_message_text(
                 "❌ Failed to retrieve servers.\n\n"
@@ -1085,7 +1422,7 @@ async def list_servers(query, context, page=0):
             )
             return
             
-        context.user_data['servers'] = servers
+        store_servers(context, servers)
         
         if not servers:
             await query.edit_message_text("📭 No servers found in your project.")
@@ -1103,89 +1440,67 @@ async def list_servers(query, context, page=0):
         end_idx = min(start_idx + servers_per_page, len(servers))
         current_page_servers = servers[start_idx:end_idx]
         
-        text = f"🖥️ *Your Servers:* (Page {page+1}/{total_pages})\n\n"
-        keyboard = []
+        parts = [f"🖥️ *Your Servers:* (Page {page+1}/{total_pages})\n\n"]
+        parts.extend(
+            f"{STATUS_EMOJI.get(server['status'], '🟡')} *{md_bold(server['name'])}* - `{server['status']}`\n"
+            for server in current_page_servers
+        )
         
-        for server in current_page_servers:
-            status_emoji = "🟢" if server['status'] == 'ACTIVE' else "🔴" if server['status'] == 'ERROR' else "🟡"
-            text += f"{status_emoji} *{server['name']}* - `{server['status']}`\n"
-            
-            keyboard.append([InlineKeyboardButton(
-                f"📋 {server['name']}", 
-                callback_data=f'server|{server["id"]}'
-            )])
+        keyboard = [
+            [InlineKeyboardButton(f"📋 {server['name']}", callback_data=f'server|{server["id"]}')]
+            for server in current_page_servers
+        ]
         
         # Add pagination buttons
-        pagination_row = []
-        if page > 0:
-            pagination_row.append(InlineKeyboardButton("⬅️ Previous", callback_data=f'list_servers_page_{page-1}'))
-        if page < total_pages - 1:
-            pagination_row.append(InlineKeyboardButton("Next ➡️", callback_data=f'list_servers_page_{page+1}'))
-        
+        pagination_row = pagination_buttons(page, total_pages, 'list_servers_page')
         if pagination_row:
             keyboard.append(pagination_row)
         
         keyboard.append([InlineKeyboardButton("🔙 Back to Main", callback_data='back_to_main')])
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await query.edit_message_text(
-            text,
-            parse_mode='Markdown',
-            reply_markup=reply_markup
-        )
+        text = ''.join(parts)
         
-    except Exception as e:
-        logger.error(f"Error in list_servers: {str(e)}")
+        await show_view(query, context, text, reply_markup)
+        
+    except Exception:
+        logger.exception("Error in list_servers")
         await query.edit_message_text("❌ An error occurred while fetching servers.")
 
 async def show_server_details(query, context, server_id):
     """Show detailed information about a server"""
     try:
-        server = openstack.get_server_details(server_id)
+        server = await asyncio.to_thread(openstack.get_server_details, server_id)
         if not server:
             await query.edit_message_text("❌ Failed to retrieve server details.")
             return
         
         # Format server details
-        text = f"🖥️ *Server Details: {server['name']}*\n\n"
-        text += f"📊 *Status:* `{server['status']}`\n"
-        text += f"🆔 *ID:* `{server['id'][:8]}...`\n"
-        text += f"🏷️ *Flavor:* `{server['flavor']['id']}`\n"
-        text += f"📅 *Created:* `{server['created'][:10]}`\n\n"
+        parts = [f"🖥️ *Server Details: {md_bold(server['name'])}*\n\n"]
+        parts.append(f"📊 *Status:* `{server['status']}`\n")
+        parts.append(f"🆔 *ID:* `{server['id'][:8]}...`\n")
+        parts.append(f"🏷️ *Flavor:* `{server['flavor']['id']}`\n")
+        parts.append(f"📅 *Created:* `{server['created'][:10]}`\n\n")
         
         # Network information
-        text += "🌐 *Networks:*\n"
+        parts.append("🌐 *Networks:*\n")
         for network_name, addresses in server.get('addresses', {}).items():
-            text += f"   • *{network_name}:*\n"
+            parts.append(f"   • *{md_bold(network_name)}:*\n")
             for addr in addresses:
                 addr_type = addr.get('OS-EXT-IPS:type', 'unknown')
-                text += f"     - `{addr['addr']}` ({addr_type})\n"
+                parts.append(f"     - `{addr['addr']}` ({addr_type})\n")
         
         # Store server info for button actions
         context.user_data['detail_server'] = server
         
-        # Initialize server_map if it doesn't exist
-        if 'server_map' not in context.user_data:
-            context.user_data['server_map'] = {}
-        
         # Find server index for callback data
-        server_index = None
-        for idx, srv_id in context.user_data.get('server_map', {}).items():
-            if srv_id == server_id:
-                server_index = idx
-                break
+        server_index = context.user_data.get('server_index_by_id', EMPTY_MAPPING).get(server_id)
         
         if server_index is None:
-            # If not found in map, add it
+            # If not found in map, append it at a fresh index so no existing button changes meaning
             servers = context.user_data.get('servers', [])
-            if not servers:
-                servers = [server]
-                context.user_data['servers'] = servers
-                server_index = "0"
-                context.user_data['server_map'] = {"0": server_id}
-            else:
-                server_index = str(len(servers) - 1) # Use the last index
-                context.user_data['server_map'][server_index] = server_id
+            store_servers(context, servers + [server])
+            server_index = str(len(servers))
         
         # Add buttons for IP management
         keyboard = [
@@ -1195,45 +1510,63 @@ async def show_server_details(query, context, server_id):
         ]
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await query.edit_message_text(
-            text,
-            parse_mode='Markdown',
-            reply_markup=reply_markup
-        )
+        text = ''.join(parts)
         
-    except Exception as e:
-        logger.error(f"Error in show_server_details: {str(e)}")
+        await show_view(query, context, text, reply_markup)
+        
+    except Exception:
+        logger.exception("Error in show_server_details")
         await query.edit_message_text("❌ An error occurred while fetching server details.")
 
-async def list_networks(query):
-    """List all networks"""
+async def list_networks(query, page=0):
+    """List all networks with pagination"""
     try:
-        networks = openstack.get_networks()
+        networks = await asyncio.to_thread(openstack.get_networks)
         if not networks:
             await query.edit_message_text("❌ Failed to retrieve networks.")
             return
         
-        text = "🌐 *Your Networks:*\n\n"
+        # Pagination settings
+        networks_per_page = 10
+        total_pages = (len(networks) + networks_per_page - 1) // networks_per_page
+        
+        # Ensure page is within bounds
+        page = max(0, min(page, total_pages - 1))
+        
+        # Get current page networks
+        start_idx = page * networks_per_page
+        end_idx = min(start_idx + networks_per_page, len(networks))
+        current_page_networks = networks[start_idx:end_idx]
         
-        for network in networks:
-            status_emoji = "🟢" if network['status'] == 'ACTIVE' else "🔴"
+        parts = [f"🌐 *Your Networks:* (Page {page+1}/{total_pages})\n\n"]
+        
+        for network in current_page_networks:
+            status_emoji = STATUS_EMOJI.get(network['status'], "🔴")
             external = "🌍" if network.get('router:external', False) else "🏠"
             
-            text += f"{status_emoji} {external} *{network['name']}*\n"
-            text += f"   Status: `{network['status']}`\n"
-            text += f"   ID: `{network['id'][:8]}...`\n\n"
+            parts.append(f"{status_emoji} {external} *{md_bold(network['name'])}*\n")
+            parts.append(f"   Status: `{network['status']}`\n")
+            parts.append(f"   ID: `{network['id'][:8]}...`\n\n")
+        
+        # Add pagination buttons
+        keyboard = []
+        pagination_row = pagination_buttons(page, total_pages, 'list_networks_page')
+        if pagination_row:
+            keyboard.append(pagination_row)
         
-        keyboard = [[InlineKeyboardButton("🔙 Back to Main", callback_data='back_to_main')]]
+        keyboard.append([InlineKeyboardButton("🔙 Back to Main", callback_data='back_to_main')])
         reply_markup = InlineKeyboardMarkup(keyboard)
         
+        text = ''.join(parts)
+        
         await query.edit_message_text(
             text,
             parse_mode='Markdown',
             reply_markup=reply_markup
         )
         
-    except Exception as e:
-        logger.error(f"Error in list_networks: {str(e)}")
+    except Exception:
+        logger.exception("Error in list_networks")
         await query.edit_message_text("❌ An error occurred while fetching networks.")
 
 async def create_network_menu(query, context):
@@ -1255,11 +1588,7 @@ This network can be used for:
 Would you like to create this network?
     """
     
-    keyboard = [
-        [InlineKeyboardButton("✅ Create Network", callback_data='confirm_create_network')],
-        [InlineKeyboardButton("❌ Cancel", callback_data='back_to_main')]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    reply_markup = CREATE_NETWORK_MARKUP
     
     await query.edit_message_text(
         text,
@@ -1267,10 +1596,10 @@ Would you like to create this network?
         reply_markup=reply_markup
     )
 
-async def list_floating_ips(query):
-    """List all floating IPs"""
+async def list_floating_ips(query, context, page=0):
+    """List all floating IPs with pagination"""
     try:
-        floating_ips = openstack.get_floating_ips()
+        floating_ips = await asyncio.to_thread(openstack.get_floating_ips)
         
         # If API returns None, show diagnostic message
         if floating_ips is None:
@@ -1281,8 +1610,7 @@ async def list_floating_ips(query):
             text += "• API endpoint configuration\n\n"
             text += "Check logs for more details."
             
-            keyboard = [[InlineKeyboardButton("🔙 Back to Main", callback_data='back_to_main')]]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            reply_markup = BACK_TO_MAIN_MARKUP
             
             await query.edit_message_text(
                 text,
@@ -1296,11 +1624,7 @@ async def list_floating_ips(query):
             text = "📭 *No floating IPs found in your project*\n\n"
             text += "You can allocate a new floating IP using the button below."
             
-            keyboard = [
-                [InlineKeyboardButton("➕ Allocate New Floating IP", callback_data='allocate_floating_ip')],
-                [InlineKeyboardButton("🔙 Back to Main", callback_data='back_to_main')]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            reply_markup = NO_FLOATING_IPS_MARKUP
             
             await query.edit_message_text(
                 text,
@@ -1309,40 +1633,60 @@ async def list_floating_ips(query):
             )
             return
         
+        # Pagination settings
+        ips_per_page = 5
+        total_pages = (len(floating_ips) + ips_per_page - 1) // ips_per_page
+        
+        # Ensure page is within bounds
+        page = max(0, min(page, total_pages - 1))
+        
+        # Get current page floating IPs
+        start_idx = page * ips_per_page
+        end_idx = min(start_idx + ips_per_page, len(floating_ips))
+        current_page_ips = floating_ips[start_idx:end_idx]
+        
+        # Remember the addresses on screen so the confirmation steps don't need to look them up
+        context.user_data['fip_addr_by_id'] = {fip['id']: fip['floating_ip_address'] for fip in current_page_ips}
+        
         # Display floating IPs
-        text = "🔗 *Your Floating IPs:*\n\n"
+        parts = [f"🔗 *Your Floating IPs:* (Page {page+1}/{total_pages})\n\n"]
         
         keyboard = []
         
-        for fip in floating_ips:
-            status_emoji = "🟢" if fip['status'] == 'ACTIVE' else "🔴" if fip['status'] == 'ERROR' else "🟡"
+        for fip in current_page_ips:
+            status_emoji = STATUS_EMOJI.get(fip['status'], "🟡")
             attached = "📎" if fip.get('fixed_ip_address') else "🔓"
             
-            text += f"{status_emoji} {attached} `{fip['floating_ip_address']}`\n"
+            parts.append(f"{status_emoji} {attached} `{fip['floating_ip_address']}`\n")
             
             # Show different information based on attachment status
             if fip.get('fixed_ip_address'):
-                text += f"   Attached to: `{fip['fixed_ip_address']}`\n"
+                parts.append(f"   Attached to: `{fip['fixed_ip_address']}`\n")
                 # Add button to disassociate
-                keyboard.append([InlineKeyboardButton(
+                action_button = InlineKeyboardButton(
                     f"🔄 Disassociate {fip['floating_ip_address']}",
                     callback_data=f"disassociate_ip|{fip['id']}"
-                )])
+                )
             else:
-                text += f"   Status: `{fip['status']}`\n"
+                parts.append(f"   Status: `{fip['status']}`\n")
                 # Add button to associate
-                keyboard.append([InlineKeyboardButton(
+                action_button = InlineKeyboardButton(
                     f"🔄 Associate {fip['floating_ip_address']}",
-                    callback_data=f"associate_floating_ip"
-                )])
+                    callback_data="associate_floating_ip"
+                )
             
-            # Add button to delete this IP
-            keyboard.append([InlineKeyboardButton(
-                f"🗑️ Delete {fip['floating_ip_address']}",
-                callback_data=f"delete_ip|{fip['id']}"
-            )])
+            # One row per IP: its association action plus delete (which asks for confirmation)
+            keyboard.append([
+                action_button,
+                InlineKeyboardButton("🗑️ Delete", callback_data=f"delete_ip|{fip['id']}")
+            ])
             
-            text += "\n"
+            parts.append("\n")
+        
+        # Add pagination buttons
+        pagination_row = pagination_buttons(page, total_pages, 'list_floating_ips_page')
+        if pagination_row:
+            keyboard.append(pagination_row)
         
         # Add general management buttons
         keyboard.append([InlineKeyboardButton("➕ Allocate New IP", callback_data='allocate_floating_ip')])
@@ -1350,24 +1694,17 @@ async def list_floating_ips(query):
         
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await query.edit_message_text(
-            text,
-            parse_mode='Markdown',
-            reply_markup=reply_markup
-        )
+        text = ''.join(parts)
         
-    except Exception as e:
-        logger.error(f"Error in list_floating_ips: {str(e)}")
+        await show_view(query, context, text, reply_markup)
+        
+    except Exception:
+        logger.exception("Error in list_floating_ips")
         await query.edit_message_text("❌ An error occurred while fetching floating IPs.")
 
 async def add_floating_ip_menu(query, context):
     """Show floating IP management menu"""
-    keyboard = [
-        [InlineKeyboardButton("➕ Allocate New IP", callback_data='allocate_floating_ip')],
-        [InlineKeyboardButton("🔄 Associate IP with Server", callback_data='associate_floating_ip')],
-        [InlineKeyboardButton("🔙 Back to Main", callback_data='back_to_main')]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    reply_markup = FLOATING_IP_MENU_MARKUP
     
     await query.edit_message_text(
         "🔗 *Floating IP Management*\n\n"
@@ -1380,7 +1717,7 @@ async def allocate_floating_ip(query):
     """Allocate a new floating IP"""
     try:
         # Get public network ID (will prefer public-167 or public-431)
-        public_network_id = openstack.get_public_network_id()
+        public_network_id = await asyncio.to_thread(openstack.get_public_network_id)
         if not public_network_id:
             await query.edit_message_text(
                 "❌ Failed to find public network for floating IP allocation.\n\n"
@@ -1390,7 +1727,7 @@ async def allocate_floating_ip(query):
             return
         
         # Allocate floating IP
-        result = openstack.allocate_floating_ip(public_network_id)
+        result = await asyncio.to_thread(openstack.allocate_floating_ip, public_network_id)
         if not result:
             await query.edit_message_text(
                 "❌ Failed to allocate floating IP.\n\n"
@@ -1405,11 +1742,7 @@ async def allocate_floating_ip(query):
         text += f"ID: `{result['id'][:8]}...`\n\n"
         text += "You can now associate this IP with a server."
         
-        keyboard = [
-            [InlineKeyboardButton("🔄 Associate with Server", callback_data='associate_floating_ip')],
-            [InlineKeyboardButton("🔙 Back to Floating IPs", callback_data='list_floating_ips')]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = ALLOCATED_IP_MARKUP
         
         await query.edit_message_text(
             text,
@@ -1417,19 +1750,16 @@ async def allocate_floating_ip(query):
             reply_markup=reply_markup
         )
         
-    except Exception as e:
-        logger.error(f"Error in allocate_floating_ip: {str(e)}")
+    except Exception:
+        logger.exception("Error in allocate_floating_ip")
         await query.edit_message_text("❌ An error occurred while allocating floating IP.")
 
 async def select_server_for_ip(query, context):
     """Select a server to associate with a floating IP"""
     try:
-        # Clear previous server data to ensure fresh data
-        if 'servers' in context.user_data:
-            del context.user_data['servers']
-            
         # Get servers
-        servers = openstack.get_servers()
+        servers = await asyncio.to_thread(openstack.get_servers)
+        
         if servers is None:  # Fix: Check for None specifically
             await query.edit_message_text(
                 "❌ Failed to retrieve servers.\n\n"
@@ -1442,8 +1772,7 @@ async def select_server_for_ip(query, context):
             return
         
         # Store servers in context with indices
-        context.user_data['servers'] = servers
-        context.user_data['server_map'] = {str(i): server['id'] for i, server in enumerate(servers)}
+        store_servers(context, servers)
         
         if not servers:
             await query.edit_message_text("📭 No servers found in your project.")
@@ -1452,13 +1781,13 @@ async def select_server_for_ip(query, context):
         text = "🖥️ *Select a Server*\n\n"
         text += "Choose a server to associate with a floating IP:"
         
-        keyboard = []
-        for i, server in enumerate(servers):
-            status_emoji = "🟢" if server['status'] == 'ACTIVE' else "🔴" if server['status'] == 'ERROR' else "🟡"
-            keyboard.append([InlineKeyboardButton(
-                f"{status_emoji} {server['name']}",
+        keyboard = [
+            [InlineKeyboardButton(
+                f"{STATUS_EMOJI.get(server['status'], '🟡')} {server['name']}",
                 callback_data=f"select_server|{i}"
-            )])
+            )]
+            for i, server in enumerate(servers)
+        ]
         
         keyboard.append([InlineKeyboardButton("🔙 Cancel", callback_data='back_to_floating_ips')])
         
@@ -1470,21 +1799,32 @@ async def select_server_for_ip(query, context):
             reply_markup=reply_markup
         )
         
-    except Exception as e:
-        logger.error(f"Error in select_server_for_ip: {str(e)}")
+    except Exception:
+        logger.exception("Error in select_server_for_ip")
         await query.edit_message_text("❌ An error occurred while retrieving servers.")
 
 async def select_floating_ip(query, context, server_index):
     """Select a floating IP to associate with the server"""
     try:
         # Get server ID from stored mapping
-        server_id = context.user_data.get('server_map', {}).get(server_index)
+        server_id = context.user_data.get('server_map', EMPTY_MAPPING).get(server_index)
         if not server_id:
             await query.edit_message_text("❌ Server not found. Please try again.")
             return
         
-        # Get floating IPs
-        floating_ips = openstack.get_floating_ips()
+        # Get server details for display
+        server = context.user_data.get('servers_by_id', EMPTY_MAPPING).get(server_id)
+        
+        # Get floating IPs through the API cache, which mutations invalidate,
+        # fetching the server in parallel if it isn't stored
+        if server:
+            floating_ips = await asyncio.to_thread(openstack.get_floating_ips)
+        else:
+            floating_ips, server = await asyncio.gather(
+                asyncio.to_thread(openstack.get_floating_ips),
+                asyncio.to_thread(openstack.get_server_details, server_id)
+            )
+        
         if floating_ips is None:
             await query.edit_message_text("❌ Failed to retrieve floating IPs.")
             return
@@ -1497,11 +1837,7 @@ async def select_floating_ip(query, context, server_index):
             text += "You don't have any unassociated floating IPs.\n"
             text += "Would you like to allocate a new one?"
             
-            keyboard = [
-                [InlineKeyboardButton("➕ Allocate New IP", callback_data='allocate_floating_ip')],
-                [InlineKeyboardButton("🔙 Back", callback_data='back_to_floating_ips')]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            reply_markup = NO_FREE_FLOATING_IPS_MARKUP
             
             await query.edit_message_text(
                 text,
@@ -1512,32 +1848,21 @@ async def select_floating_ip(query, context, server_index):
         
         # Store floating IPs with indices
         context.user_data['floating_ips'] = unassociated_ips
+        context.user_data['floating_ips_by_id'] = {ip['id']: ip for ip in unassociated_ips}
         context.user_data['ip_map'] = {str(i): ip['id'] for i, ip in enumerate(unassociated_ips)}
         context.user_data['selected_server_id'] = server_id
         
-        # Get server details for display
-        server = None
-        for s in context.user_data.get('servers', []):
-            if s['id'] == server_id:
-                server = s
-                break
-        
         if not server:
-            server = openstack.get_server_details(server_id)
-            if not server:
-                await query.edit_message_text("❌ Failed to retrieve server details.")
-                return
+            await query.edit_message_text("❌ Failed to retrieve server details.")
+            return
         
-        text = f"🔗 *Select Floating IP for {server['name']}*\n\n"
+        text = f"🔗 *Select Floating IP for {md_bold(server['name'])}*\n\n"
         text += "Choose a floating IP to associate with this server:"
         
-        keyboard = []
-        for i, ip in enumerate(unassociated_ips):
-            keyboard.append([InlineKeyboardButton(
-                f"🔓 {ip['floating_ip_address']}",
-                callback_data=f"select_ip|{i}"
-            )])
-        
+        keyboard = [
+            [InlineKeyboardButton(f"🔓 {ip['floating_ip_address']}", callback_data=f"select_ip|{i}")]
+            for i, ip in enumerate(unassociated_ips)
+        ]
         keyboard.append([InlineKeyboardButton("🔙 Cancel", callback_data='back_to_floating_ips')])
         reply_markup = InlineKeyboardMarkup(keyboard)
         
@@ -1547,15 +1872,15 @@ async def select_floating_ip(query, context, server_index):
             reply_markup=reply_markup
         )
         
-    except Exception as e:
-        logger.error(f"Error in select_floating_ip: {str(e)}")
+    except Exception:
+        logger.exception("Error in select_floating_ip")
         await query.edit_message_text("❌ An error occurred while retrieving floating IPs.")
 
 async def confirm_associate_ip(query, context, ip_index):
     """Confirm association of floating IP with server"""
     try:
         # Get IP ID from stored mapping
-        ip_id = context.user_data.get('ip_map', {}).get(ip_index)
+        ip_id = context.user_data.get('ip_map', EMPTY_MAPPING).get(ip_index)
         server_id = context.user_data.get('selected_server_id')
         
         if not ip_id or not server_id:
@@ -1563,28 +1888,17 @@ async def confirm_associate_ip(query, context, ip_index):
             return
         
         # Get floating IP details
-        floating_ip = None
-        for ip in context.user_data.get('floating_ips', []):
-            if ip['id'] == ip_id:
-                floating_ip = ip
-                break
+        floating_ip = context.user_data.get('floating_ips_by_id', EMPTY_MAPPING).get(ip_id)
         
         if not floating_ip:
             await query.edit_message_text("❌ Floating IP not found.")
             return
         
         # Get server details
-        server = None
-        for s in context.user_data.get('servers', []):
-            if s['id'] == server_id:
-                server = s
-                break
-        
+        server = await resolve_server(context, server_id)
         if not server:
-            server = openstack.get_server_details(server_id)
-            if not server:
-                await query.edit_message_text("❌ Failed to retrieve server details.")
-                return
+            await query.edit_message_text("❌ Failed to retrieve server details.")
+            return
         
         # Store for confirmation
         context.user_data['confirm_ip_id'] = ip_id
@@ -1594,7 +1908,7 @@ async def confirm_associate_ip(query, context, ip_index):
         text += f"Are you sure you want to associate floating IP:\n"
         text += f"`{floating_ip['floating_ip_address']}`\n\n"
         text += f"with server:\n"
-        text += f"`{server['name']}`?\n\n"
+        text += f"`{md_code(server['name'])}`?\n\n"
         text += "**Note:** The server must have an interface on a network with external gateway access."
         
         keyboard = [
@@ -1609,32 +1923,38 @@ async def confirm_associate_ip(query, context, ip_index):
             reply_markup=reply_markup
         )
         
-    except Exception as e:
-        logger.error(f"Error in confirm_associate_ip: {str(e)}")
+    except Exception:
+        logger.exception("Error in confirm_associate_ip")
         await query.edit_message_text("❌ An error occurred while preparing confirmation.")
 
 async def do_associate_ip(query, context, ip_index):
     """Associate floating IP with server"""
     try:
-        # Get stored IDs
-        ip_id = context.user_data.get('confirm_ip_id')
-        server_id = context.user_data.get('confirm_server_id')
+        # Take the pending request so a queued second tap finds nothing to submit
+        ip_id = context.user_data.pop('confirm_ip_id', None)
+        server_id = context.user_data.pop('confirm_server_id', None)
         
         if not ip_id or not server_id:
             await query.edit_message_text("❌ Invalid operation. Please try again.")
             return
         
+        # Nova interfaces and Neutron gateway topology are independent, fetch them together
+        interfaces, external_networks = await asyncio.gather(
+            asyncio.to_thread(openstack.get_server_interfaces, server_id),
+            asyncio.to_thread(openstack.find_networks_with_external_gateway)
+        )
+        
         # Get a suitable interface for floating IP association
-        suitable_interface = openstack.get_suitable_interface_for_floating_ip(server_id)
+        suitable_interface = await asyncio.to_thread(
+            openstack.get_suitable_interface_for_floating_ip, server_id, interfaces, external_networks
+        )
         
         if not suitable_interface:
-            # Try to find networks with external gateway and attach interface
-            external_networks = openstack.find_networks_with_external_gateway()
-            
+            # Try to attach an interface on one of the networks with external gateway
             if external_networks:
                 # Try to attach interface to a network with external access
                 for network_id in external_networks:
-                    interface = openstack.attach_interface(server_id, network_id)
+                    interface = await asyncio.to_thread(openstack.attach_interface, server_id, network_id)
                     if interface:
                         suitable_interface = interface
                         logger.info(f"Attached new interface {interface['port_id']} to network {network_id}")
@@ -1657,7 +1977,7 @@ async def do_associate_ip(query, context, ip_index):
         logger.info(f"Using interface port {port_id} for floating IP association")
         
         # Associate floating IP with port
-        result = openstack.associate_floating_ip(ip_id, port_id)
+        result = await asyncio.to_thread(openstack.associate_floating_ip, ip_id, port_id)
         if not result:
             await query.edit_message_text(
                 "❌ *Failed to Associate Floating IP*\n\n"
@@ -1678,11 +1998,7 @@ async def do_associate_ip(query, context, ip_index):
         text += f"Status: `{result['status']}`\n\n"
         text += "The floating IP has been successfully associated with the server's interface."
         
-        keyboard = [
-            [InlineKeyboardButton("🔙 Back to Floating IPs", callback_data='list_floating_ips')],
-            [InlineKeyboardButton("🔙 Back to Main", callback_data='back_to_main')]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = FLOATING_IP_DONE_MARKUP
         
         await query.edit_message_text(
             text,
@@ -1690,32 +2006,29 @@ async def do_associate_ip(query, context, ip_index):
             reply_markup=reply_markup
         )
         
-    except Exception as e:
-        logger.error(f"Error in do_associate_ip: {str(e)}")
+    except Exception:
+        logger.exception("Error in do_associate_ip")
         await query.edit_message_text("❌ An error occurred while associating floating IP.")
 
 async def confirm_disassociate_ip(query, context, ip_id):
     """Confirm disassociation of floating IP"""
     try:
-        # Get floating IP details
-        floating_ips = openstack.get_floating_ips()
-        if floating_ips is None:
-            await query.edit_message_text("❌ Failed to retrieve floating IPs.")
-            return
-        
-        floating_ip = None
-        for ip in floating_ips:
-            if ip['id'] == ip_id:
-                floating_ip = ip
-                break
-        
-        if not floating_ip:
-            await query.edit_message_text("❌ Floating IP not found.")
-            return
+        # The address shown in the list is all the confirmation needs; look it up only if missing
+        ip_address = context.user_data.get('fip_addr_by_id', EMPTY_MAPPING).get(ip_id)
+        if not ip_address:
+            floating_ip = await asyncio.to_thread(openstack.get_floating_ip, ip_id)
+            if floating_ip is None:
+                await query.edit_message_text("❌ Failed to retrieve floating IPs.")
+                return
+            
+            if not floating_ip:
+                await query.edit_message_text("❌ Floating IP not found.")
+                return
+            ip_address = floating_ip['floating_ip_address']
         
         text = "⚠️ *Confirm Disassociation*\n\n"
         text += f"Are you sure you want to disassociate floating IP:\n"
-        text += f"`{floating_ip['floating_ip_address']}`\n\n"
+        text += f"`{ip_address}`\n\n"
         text += f"from its current port?"
         
         keyboard = [
@@ -1730,15 +2043,15 @@ async def confirm_disassociate_ip(query, context, ip_id):
             reply_markup=reply_markup
         )
         
-    except Exception as e:
-        logger.error(f"Error in confirm_disassociate_ip: {str(e)}")
+    except Exception:
+        logger.exception("Error in confirm_disassociate_ip")
         await query.edit_message_text("❌ An error occurred while preparing confirmation.")
 
 async def do_disassociate_ip(query, ip_id):
     """Disassociate floating IP"""
     try:
         # Disassociate floating IP
-        result = openstack.disassociate_floating_ip(ip_id)
+        result = await asyncio.to_thread(openstack.disassociate_floating_ip, ip_id)
         if not result:
             await query.edit_message_text(
                 "❌ Failed to disassociate floating IP.\n\n"
@@ -1752,11 +2065,7 @@ async def do_disassociate_ip(query, ip_id):
         text += f"Status: `{result['status']}`\n\n"
         text += "The IP has been successfully disassociated and is now available."
         
-        keyboard = [
-            [InlineKeyboardButton("🔙 Back to Floating IPs", callback_data='list_floating_ips')],
-            [InlineKeyboardButton("🔙 Back to Main", callback_data='back_to_main')]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = FLOATING_IP_DONE_MARKUP
         
         await query.edit_message_text(
             text,
@@ -1764,32 +2073,29 @@ async def do_disassociate_ip(query, ip_id):
             reply_markup=reply_markup
         )
         
-    except Exception as e:
-        logger.error(f"Error in do_disassociate_ip: {str(e)}")
+    except Exception:
+        logger.exception("Error in do_disassociate_ip")
         await query.edit_message_text("❌ An error occurred while disassociating floating IP.")
 
 async def confirm_delete_ip(query, context, ip_id):
     """Confirm deletion of floating IP"""
     try:
-        # Get floating IP details
-        floating_ips = openstack.get_floating_ips()
-        if floating_ips is None:
-            await query.edit_message_text("❌ Failed to retrieve floating IPs.")
-            return
-        
-        floating_ip = None
-        for ip in floating_ips:
-            if ip['id'] == ip_id:
-                floating_ip = ip
-                break
-        
-        if not floating_ip:
-            await query.edit_message_text("❌ Floating IP not found.")
-            return
+        # The address shown in the list is all the confirmation needs; look it up only if missing
+        ip_address = context.user_data.get('fip_addr_by_id', EMPTY_MAPPING).get(ip_id)
+        if not ip_address:
+            floating_ip = await asyncio.to_thread(openstack.get_floating_ip, ip_id)
+            if floating_ip is None:
+                await query.edit_message_text("❌ Failed to retrieve floating IPs.")
+                return
+            
+            if not floating_ip:
+                await query.edit_message_text("❌ Floating IP not found.")
+                return
+            ip_address = floating_ip['floating_ip_address']
         
         text = "⚠️ *Confirm Deletion*\n\n"
         text += f"Are you sure you want to delete floating IP:\n"
-        text += f"`{floating_ip['floating_ip_address']}`?\n\n"
+        text += f"`{ip_address}`?\n\n"
         text += "This action cannot be undone."
         
         keyboard = [
@@ -1804,15 +2110,15 @@ async def confirm_delete_ip(query, context, ip_id):
             reply_markup=reply_markup
         )
         
-    except Exception as e:
-        logger.error(f"Error in confirm_delete_ip: {str(e)}")
+    except Exception:
+        logger.exception("Error in confirm_delete_ip")
         await query.edit_message_text("❌ An error occurred while preparing confirmation.")
 
 async def do_delete_ip(query, ip_id):
     """Delete floating IP"""
     try:
         # Delete floating IP
-        success = openstack.delete_floating_ip(ip_id)
+        success = await asyncio.to_thread(openstack.delete_floating_ip, ip_id)
         if not success:
             await query.edit_message_text(
                 "❌ Failed to delete floating IP.\n\n"
@@ -1824,11 +2130,7 @@ async def do_delete_ip(query, ip_id):
         text = "✅ *Floating IP Deleted Successfully*\n\n"
         text += "The floating IP has been successfully deleted."
         
-        keyboard = [
-            [InlineKeyboardButton("🔙 Back to Floating IPs", callback_data='list_floating_ips')],
-            [InlineKeyboardButton("🔙 Back to Main", callback_data='back_to_main')]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = FLOATING_IP_DONE_MARKUP
         
         await query.edit_message_text(
             text,
@@ -1836,43 +2138,36 @@ async def do_delete_ip(query, ip_id):
             reply_markup=reply_markup
         )
         
-    except Exception as e:
-        logger.error(f"Error in do_delete_ip: {str(e)}")
+    except Exception:
+        logger.exception("Error in do_delete_ip")
         await query.edit_message_text("❌ An error occurred while deleting floating IP.")
 
 # Fixed IP management functions
 async def manage_fixed_ips(query, context):
     """Show fixed IP management menu"""
     try:
-        # Clear previous server data to ensure fresh data
-        if 'servers' in context.user_data:
-            del context.user_data['servers']
-            
         # Get servers
-        servers = openstack.get_servers()
+        servers = await asyncio.to_thread(openstack.get_servers)
         if servers is None:
             await query.edit_message_text("❌ Failed to retrieve servers.")
             return
         
         # Store servers in context with indices
-        context.user_data['servers'] = servers
-        context.user_data['server_map'] = {str(i): server['id'] for i, server in enumerate(servers)}
+        store_servers(context, servers)
         
         if not servers:
             await query.edit_message_text("📭 No servers found in your project.")
             return
         
-        text = "🔧 *Fixed IP Management*\n\n"
-        text += "Select a server to manage its fixed IPs:\n"
-        text += "Fixed IPs are added to existing interfaces (same MAC address)."
+        text = FIXED_IP_MENU_TEXT
         
-        keyboard = []
-        for i, server in enumerate(servers):
-            status_emoji = "🟢" if server['status'] == 'ACTIVE' else "🔴" if server['status'] == 'ERROR' else "🟡"
-            keyboard.append([InlineKeyboardButton(
-                f"{status_emoji} {server['name']}",
+        keyboard = [
+            [InlineKeyboardButton(
+                f"{STATUS_EMOJI.get(server['status'], '🟡')} {server['name']}",
                 callback_data=f"select_server_for_fixed_ip|{i}"
-            )])
+            )]
+            for i, server in enumerate(servers)
+        ]
         
         keyboard.append([InlineKeyboardButton("🔙 Back to Main", callback_data='back_to_main')])
         reply_markup = InlineKeyboardMarkup(keyboard)
@@ -1883,34 +2178,27 @@ async def manage_fixed_ips(query, context):
             reply_markup=reply_markup
         )
         
-    except Exception as e:
-        logger.error(f"Error in manage_fixed_ips: {str(e)}")
+    except Exception:
+        logger.exception("Error in manage_fixed_ips")
         await query.edit_message_text("❌ An error occurred while retrieving servers.")
 
 async def manage_server_fixed_ips(query, context, server_index):
     """Manage fixed IPs for a specific server"""
     try:
         # Get server ID from stored mapping
-        server_id = context.user_data.get('server_map', {}).get(server_index)
+        server_id = context.user_data.get('server_map', EMPTY_MAPPING).get(server_index)
         if not server_id:
             await query.edit_message_text("❌ Server not found. Please try again.")
             return
         
         # Get server details
-        server = None
-        for s in context.user_data.get('servers', []):
-            if s['id'] == server_id:
-                server = s
-                break
-        
+        server = await resolve_server(context, server_id)
         if not server:
-            server = openstack.get_server_details(server_id)
-            if not server:
-                await query.edit_message_text("❌ Failed to retrieve server details.")
-                return
+            await query.edit_message_text("❌ Failed to retrieve server details.")
+            return
         
         # Get server interfaces
-        interfaces = openstack.get_server_interfaces(server_id)
+        interfaces = await asyncio.to_thread(openstack.get_server_interfaces, server_id)
         if not interfaces:
             await query.edit_message_text("❌ No interfaces found for this server.")
             return
@@ -1920,24 +2208,22 @@ async def manage_server_fixed_ips(query, context, server_index):
         context.user_data['current_server_index'] = server_index
         context.user_data['server_interfaces'] = interfaces
         
-        text = f"🔧 *Fixed IPs for {server['name']}*\n\n"
-        
         # List current fixed IPs by interface
-        text += "Current Interfaces and Fixed IPs:\n"
+        parts = [FIXED_IP_HEADER_TEMPLATE.format(name=md_bold(server['name']))]
         fixed_ips = []
         
         for i, interface in enumerate(interfaces):
             port_id = interface['port_id']
             net_id = interface['net_id']
-            text += f"\n**Interface {i+1}** (Port: `{port_id[:8]}...`)\n"
-            text += f"Network: `{net_id[:8]}...`\n"
+            parts.append(f"\n**Interface {i+1}** (Port: `{port_id[:8]}...`)\n")
+            parts.append(f"Network: `{net_id[:8]}...`\n")
             
             interface_fixed_ips = interface.get('fixed_ips', [])
             if interface_fixed_ips:
                 for fixed_ip in interface_fixed_ips:
                     ip_address = fixed_ip['ip_address']
                     subnet_id = fixed_ip['subnet_id']
-                    text += f"• `{ip_address}` (subnet: `{subnet_id[:8]}...`)\n"
+                    parts.append(f"• `{ip_address}` (subnet: `{subnet_id[:8]}...`)\n")
                     # Store IP data for removal
                     fixed_ips.append({
                         'ip_address': ip_address,
@@ -1946,34 +2232,30 @@ async def manage_server_fixed_ips(query, context, server_index):
                         'interface_index': i
                     })
             else:
-                text += "• No fixed IPs\n"
+                parts.append("• No fixed IPs\n")
         
         # Store fixed IPs for removal operations
         context.user_data['fixed_ips'] = fixed_ips
         
-        keyboard = [
+        # Remove buttons for each IP using indices, above the static rows
+        remove_buttons = [
+            [InlineKeyboardButton(f"🗑️ Remove {ip_data['ip_address']}", callback_data=f"remove_fixed_ip|{i}")]
+            for i, ip_data in enumerate(fixed_ips)
+        ]
+        keyboard = remove_buttons + [
             [InlineKeyboardButton("➕ Add Fixed IP", callback_data=f"add_fixed_ip|{server_index}")],
             [InlineKeyboardButton("🔙 Back to Server List", callback_data='manage_fixed_ips')],
             [InlineKeyboardButton("🔙 Back to Main", callback_data='back_to_main')]
         ]
         
-        # Add remove buttons for each IP using indices
-        for i, ip_data in enumerate(fixed_ips):
-            keyboard.insert(0, [InlineKeyboardButton(
-                f"🗑️ Remove {ip_data['ip_address']}",
-                callback_data=f"remove_fixed_ip|{i}"
-            )])
-        
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await query.edit_message_text(
-            text,
-            parse_mode='Markdown',
-            reply_markup=reply_markup
-        )
+        text = ''.join(parts)
         
-    except Exception as e:
-        logger.error(f"Error in manage_server_fixed_ips: {str(e)}")
+        await show_view(query, context, text, reply_markup)
+        
+    except Exception:
+        logger.exception("Error in manage_server_fixed_ips")
         await query.edit_message_text("❌ An error occurred while retrieving server details.")
 
 async def select_interface_for_fixed_ip(query, context, server_index):
@@ -1986,18 +2268,14 @@ async def select_interface_for_fixed_ip(query, context, server_index):
             return
         
         # Get server details for display
-        server_id = context.user_data.get('server_map', {}).get(server_index)
-        server = None
-        for s in context.user_data.get('servers', []):
-            if s['id'] == server_id:
-                server = s
-                break
+        server_id = context.user_data.get('server_map', EMPTY_MAPPING).get(server_index)
+        server = await resolve_server(context, server_id)
         
         if not server:
             await query.edit_message_text("❌ Server not found.")
             return
         
-        text = f"🔌 *Select Interface for {server['name']}*\n\n"
+        text = f"🔌 *Select Interface for {md_bold(server['name'])}*\n\n"
         text += "Choose an interface to add a fixed IP to:\n"
         text += "(Fixed IPs are added to existing interfaces)\n\n"
         
@@ -2021,8 +2299,8 @@ async def select_interface_for_fixed_ip(query, context, server_index):
             reply_markup=reply_markup
         )
         
-    except Exception as e:
-        logger.error(f"Error in select_interface_for_fixed_ip: {str(e)}")
+    except Exception:
+        logger.exception("Error in select_interface_for_fixed_ip")
         await query.edit_message_text("❌ An error occurred while selecting interface.")
 
 async def select_network_for_fixed_ip(query, context, interface_index):
@@ -2039,22 +2317,26 @@ async def select_network_for_fixed_ip(query, context, interface_index):
         context.user_data['selected_interface_index'] = interface_index
         
         # Get all networks and their subnets
-        networks = openstack.get_networks_for_fixed_ip()
-        subnets = openstack.get_subnets()
+        networks, subnets = await asyncio.gather(
+            asyncio.to_thread(openstack.get_networks_for_fixed_ip),
+            asyncio.to_thread(openstack.get_subnets)
+        )
         
         if not networks or not subnets:
             await query.edit_message_text("❌ Failed to retrieve networks or subnets.")
             return
         
+        # Group subnets by network once instead of rescanning all subnets for every network
+        subnets_by_network = {}
+        for subnet in subnets:
+            subnets_by_network.setdefault(subnet['network_id'], []).append(subnet)
+        
         # Create a list of available subnets
-        available_subnets = []
-        for network in networks:
-            network_subnets = [s for s in subnets if s['network_id'] == network['id']]
-            for subnet in network_subnets:
-                available_subnets.append({
-                    'subnet': subnet,
-                    'network': network
-                })
+        available_subnets = [
+            {'subnet': subnet, 'network': network}
+            for network in networks
+            for subnet in subnets_by_network.get(network['id'], ())
+        ]
         
         if not available_subnets:
             await query.edit_message_text("❌ No subnets available for adding fixed IPs.")
@@ -2068,16 +2350,14 @@ async def select_network_for_fixed_ip(query, context, interface_index):
         text += f"Choose a subnet to add a fixed IP from:\n"
         text += f"Interface: `{selected_interface['port_id'][:8]}...`\n\n"
         
-        keyboard = []
-        for i, subnet_data in enumerate(available_subnets):
-            subnet = subnet_data['subnet']
-            network = subnet_data['network']
-            
-            status_emoji = "🟢" if network['status'] == 'ACTIVE' else "🔴"
-            keyboard.append([InlineKeyboardButton(
-                f"{status_emoji} {network['name']} - {subnet['cidr']}",
+        keyboard = [
+            [InlineKeyboardButton(
+                f"{STATUS_EMOJI.get(subnet_data['network']['status'], '🔴')} "
+                f"{subnet_data['network']['name']} - {subnet_data['subnet']['cidr']}",
                 callback_data=f"select_network|{i}"
-            )])
+            )]
+            for i, subnet_data in enumerate(available_subnets)
+        ]
         
         keyboard.append([InlineKeyboardButton("🔙 Cancel", callback_data=f'select_server_for_fixed_ip|{context.user_data.get("current_server_index", "0")}')])
         reply_markup = InlineKeyboardMarkup(keyboard)
@@ -2088,15 +2368,15 @@ async def select_network_for_fixed_ip(query, context, interface_index):
             reply_markup=reply_markup
         )
         
-    except Exception as e:
-        logger.error(f"Error in select_network_for_fixed_ip: {str(e)}")
+    except Exception:
+        logger.exception("Error in select_network_for_fixed_ip")
         await query.edit_message_text("❌ An error occurred while retrieving networks.")
 
 async def confirm_add_fixed_ip(query, context, network_index):
     """Confirm adding a fixed IP to an interface"""
     try:
         # Get subnet from stored mapping
-        subnet_id = context.user_data.get('subnet_map', {}).get(network_index)
+        subnet_id = context.user_data.get('subnet_map', EMPTY_MAPPING).get(network_index)
         selected_interface = context.user_data.get('selected_interface')
         server_index = context.user_data.get('current_server_index')
         
@@ -2116,11 +2396,7 @@ async def confirm_add_fixed_ip(query, context, network_index):
         
         # Get server details
         server_id = context.user_data.get('current_server_id')
-        server = None
-        for s in context.user_data.get('servers', []):
-            if s['id'] == server_id:
-                server = s
-                break
+        server = await resolve_server(context, server_id)
         
         if not server:
             await query.edit_message_text("❌ Server not found.")
@@ -2130,13 +2406,12 @@ async def confirm_add_fixed_ip(query, context, network_index):
         context.user_data['confirm_subnet_id'] = subnet_id
         context.user_data['confirm_port_id'] = selected_interface['port_id']
         
-        text = "⚠️ *Confirm Add Fixed IP*\n\n"
-        text += f"Add a fixed IP to:\n"
-        text += f"**Server:** `{server['name']}`\n"
-        text += f"**Interface:** `{selected_interface['port_id'][:8]}...`\n"
-        text += f"**Network:** `{network['name']}`\n"
-        text += f"**Subnet:** `{subnet['cidr']}`\n\n"
-        text += "This will add an additional IP address to the existing interface."
+        text = CONFIRM_ADD_FIXED_IP_TEMPLATE.format(
+            server=md_code(server['name']),
+            port=selected_interface['port_id'][:8],
+            network=md_code(network['name']),
+            cidr=subnet['cidr']
+        )
         
         keyboard = [
             [InlineKeyboardButton("✅ Yes, Add IP", callback_data=f"confirm_add_fixed_ip|{network_index}")],
@@ -2150,16 +2425,16 @@ async def confirm_add_fixed_ip(query, context, network_index):
             reply_markup=reply_markup
         )
         
-    except Exception as e:
-        logger.error(f"Error in confirm_add_fixed_ip: {str(e)}")
+    except Exception:
+        logger.exception("Error in confirm_add_fixed_ip")
         await query.edit_message_text("❌ An error occurred while preparing confirmation.")
 
 async def do_add_fixed_ip(query, context, network_index):
     """Add a fixed IP to an interface"""
     try:
-        # Get stored IDs
-        subnet_id = context.user_data.get('confirm_subnet_id')
-        port_id = context.user_data.get('confirm_port_id')
+        # Take the pending request so a queued second tap finds nothing to submit
+        subnet_id = context.user_data.pop('confirm_subnet_id', None)
+        port_id = context.user_data.pop('confirm_port_id', None)
         server_id = context.user_data.get('current_server_id')
         server_index = context.user_data.get('current_server_index')
         
@@ -2169,8 +2444,11 @@ async def do_add_fixed_ip(query, context, network_index):
         
         logger.info(f"Adding fixed IP: server_id={server_id}, port_id={port_id}, subnet_id={subnet_id}")
         
+        # Show progress while the port update runs (also drops the confirm buttons)
+        await query.edit_message_text("⏳ Adding fixed IP...")
+        
         # Add fixed IP to the interface
-        success = openstack.add_fixed_ip_to_interface(server_id, port_id, subnet_id)
+        success = await asyncio.to_thread(openstack.add_fixed_ip_to_interface, server_id, port_id, subnet_id)
         if not success:
             await query.edit_message_text(
                 "❌ *Failed to Add Fixed IP*\n\n"
@@ -2201,11 +2479,21 @@ async def do_add_fixed_ip(query, context, network_index):
             reply_markup=reply_markup
         )
         
-    except Exception as e:
-        logger.error(f"Error in do_add_fixed_ip: {str(e)}")
+    except Exception:
+        logger.exception("Error in do_add_fixed_ip")
         await query.edit_message_text("❌ An error occurred while adding fixed IP.")
 
-async def confirm_remove_fixed_ip(query, context, ip_data):
+async def select_fixed_ip_for_removal(query, context, ip_index):
+    """Look up the selected fixed IP and ask for removal confirmation"""
+    # Get the IP address from the stored fixed IPs
+    fixed_ips = context.user_data.get('fixed_ips', [])
+    if ip_index.isdigit() and int(ip_index) < len(fixed_ips):
+        ip_data = fixed_ips[int(ip_index)]
+        await confirm_remove_fixed_ip(query, context, ip_data, ip_index)
+    else:
+        await query.edit_message_text("❌ Invalid IP selection. Please try again.")
+
+async def confirm_remove_fixed_ip(query, context, ip_data, ip_index):
     """Confirm removing a fixed IP from an interface"""
     try:
         # Get stored server ID
@@ -2215,11 +2503,7 @@ async def confirm_remove_fixed_ip(query, context, ip_data):
             return
             
         # Get server details
-        server = None
-        for s in context.user_data.get('servers', []):
-            if s['id'] == server_id:
-                server = s
-                break
+        server = await resolve_server(context, server_id)
         
         if not server:
             await query.edit_message_text("❌ Failed to retrieve server details.")
@@ -2228,21 +2512,22 @@ async def confirm_remove_fixed_ip(query, context, ip_data):
         ip_address = ip_data['ip_address']
         port_id = ip_data['port_id']
         
-        text = "⚠️ *Confirm Remove Fixed IP*\n\n"
-        text += f"Remove fixed IP:\n"
-        text += f"**IP Address:** `{ip_address}`\n"
-        text += f"**Server:** `{server['name']}`\n"
-        text += f"**Interface:** `{port_id[:8]}...`\n\n"
-        text += "**Warning:** This action cannot be undone and may affect:\n"
-        text += "• Associated floating IPs\n"
-        text += "• Network connectivity\n"
-        text += "• Running services"
+        text = CONFIRM_REMOVE_FIXED_IP_TEMPLATE.format(
+            ip=ip_address,
+            server=md_code(server['name']),
+            port=port_id[:8]
+        )
         
         # Store IP data for removal
-        context.user_data['confirm_remove_ip'] = ip_data
+        context.user_data['confirm_remove_ip'] = RemoveIpCtx(
+            ip_address=ip_address,
+            port_id=port_id,
+            server_id=server_id,
+            server_index=context.user_data.get('current_server_index', '0')
+        )
         
         keyboard = [
-            [InlineKeyboardButton("✅ Yes, Remove IP", callback_data=f"confirm_remove_fixed_ip|{ip_address}")],
+            [InlineKeyboardButton("✅ Yes, Remove IP", callback_data=f"confirm_remove_fixed_ip|{ip_index}")],
             [InlineKeyboardButton("❌ No, Cancel", callback_data=f'select_server_for_fixed_ip|{context.user_data.get("current_server_index", "0")}')]
         ]
         reply_markup = InlineKeyboardMarkup(keyboard)
@@ -2253,29 +2538,32 @@ async def confirm_remove_fixed_ip(query, context, ip_data):
             reply_markup=reply_markup
         )
         
-    except Exception as e:
-        logger.error(f"Error in confirm_remove_fixed_ip: {str(e)}")
+    except Exception:
+        logger.exception("Error in confirm_remove_fixed_ip")
         await query.edit_message_text("❌ An error occurred while preparing confirmation.")
 
 async def do_remove_fixed_ip(query, context, ip_index):
     """Remove a fixed IP from an interface"""
     try:
-        # Get stored data
-        ip_data = context.user_data.get('confirm_remove_ip')
-        server_id = context.user_data.get('current_server_id')
-        server_index = context.user_data.get('current_server_index')
+        # Take the pending removal so a queued second tap finds nothing to submit
+        remove_ctx = context.user_data.pop('confirm_remove_ip', None)
         
-        if not ip_data or not server_id:
+        if remove_ctx is None:
             await query.edit_message_text("❌ Invalid operation. Please try again.")
             return
         
-        ip_address = ip_data['ip_address']
-        port_id = ip_data['port_id']
+        ip_address = remove_ctx.ip_address
+        port_id = remove_ctx.port_id
+        server_id = remove_ctx.server_id
+        server_index = remove_ctx.server_index
         
         logger.info(f"Removing fixed IP: server_id={server_id}, port_id={port_id}, ip_address={ip_address}")
         
+        # Show progress while the port update runs (also drops the confirm buttons)
+        await query.edit_message_text(f"⏳ Removing fixed IP `{ip_address}`...", parse_mode='Markdown')
+        
         # Remove fixed IP from the interface
-        success = openstack.remove_fixed_ip_from_interface(server_id, port_id, ip_address)
+        success = await asyncio.to_thread(openstack.remove_fixed_ip_from_interface, server_id, port_id, ip_address)
         if not success:
             await query.edit_message_text(
                 "❌ *Failed to Remove Fixed IP*\n\n"
@@ -2305,101 +2593,38 @@ async def do_remove_fixed_ip(query, context, ip_index):
             reply_markup=reply_markup
         )
         
-    except Exception as e:
-        logger.error(f"Error in do_remove_fixed_ip: {str(e)}")
+    except Exception:
+        logger.exception("Error in do_remove_fixed_ip")
         await query.edit_message_text("❌ An error occurred while removing fixed IP.")
 
 async def show_help(query):
     """Show help information"""
-    help_text = """
-ℹ️ *OpenStack Bot Help*
-
-*Available Commands:*
-• `/start` - Show main menu
-• `/status` - Check bot status
-
-*Features:*
-• 📊 View all your VPS servers
-• 🌐 List available networks
-• 🔗 Monitor floating IP addresses
-• ➕ Add floating IPs to servers
-• 🔧 Manage fixed IPs on servers
-• 🛠️ Create private networks
-• 📋 Get detailed server information
-
-*Floating IP Management:*
-• Allocate new floating IPs from public-167/public-431
-• Associate IPs with servers (requires external gateway access)
-• Disassociate IPs from servers
-• Delete floating IPs
-
-*Fixed IP Management:*
-• Add fixed IPs to existing interfaces (same MAC address)
-• Remove fixed IPs from interfaces
-• View current IP assignments by interface
-
-*Network Requirements:*
-• Floating IPs require servers on networks with external gateway
-• Fixed IPs are added to existing interfaces, not new ones
-• Private networks can be created for isolation
-
-*Status Indicators:*
-• 🟢 Active/Available
-• 🔴 Error/Down
-• 🟡 Building/Transitioning
-• 🌍 External network
-• 🏠 Internal network
-• 📎 Attached floating IP
-• 🔓 Unattached floating IP
-
-*Need help?* Contact your system administrator.
-    """
-    
-    keyboard = [[InlineKeyboardButton("🔙 Back to Main", callback_data='back_to_main')]]
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    reply_markup = BACK_TO_MAIN_MARKUP
     
     await query.edit_message_text(
-        help_text,
+        HELP_TEXT,
         parse_mode='Markdown',
         reply_markup=reply_markup
     )
 
-async def back_to_main(query):
-    """Return to main menu"""
-    keyboard = [
-        [InlineKeyboardButton("📊 List Servers", callback_data='list_servers')],
-        [InlineKeyboardButton("🌐 List Networks", callback_data='list_networks')],
-        [InlineKeyboardButton("🔗 Floating IPs", callback_data='list_floating_ips')],
-        [InlineKeyboardButton("➕ Add Floating IP", callback_data='add_floating_ip')],
-        [InlineKeyboardButton("🔧 Manage Fixed IPs", callback_data='manage_fixed_ips')],
-        [InlineKeyboardButton("🛠️ Create Private Network", callback_data='create_network')],
-        [InlineKeyboardButton("ℹ️ Help", callback_data='help')]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    welcome_text = """
-🤖 *OpenStack Management Bot*
-
-Welcome! I can help you monitor and manage your OpenStack VPS instances.
-
-Choose an option from the menu below:
-    """
-    
+async def back_to_main(query, notice=None):
+    """Return to main menu, optionally with a notice above the welcome text"""
     await query.edit_message_text(
-        welcome_text,
+        f"{notice}\n{WELCOME_TEXT}" if notice else WELCOME_TEXT,
         parse_mode='Markdown',
-        reply_markup=reply_markup
+        reply_markup=MAIN_MENU_MARKUP
     )
 
+async def cancel_operation(query, context):
+    """Cancel the current operation and return to main menu"""
+    await back_to_main(query, "❌ Operation cancelled.")
+
+@authorized
 async def status(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Check bot and OpenStack connection status"""
-    # Check authorization
-    if not await check_authorization(update, context):
-        return
-    
     try:
-        # Test OpenStack connection
-        if openstack.authenticate():
+        # Test OpenStack connection, reusing the cached token while it is valid
+        if await asyncio.to_thread(openstack.get_headers):
             status_text = "✅ *Bot Status: Online*\n✅ *OpenStack API: Connected*"
             
             # Check services
@@ -2407,15 +2632,17 @@ async def status(update: Update, context: ContextTypes.DEFAULT_TYPE):
             for service_type, url in openstack.service_catalog.items():
                 services_text += f"• `{service_type}`: ✅\n"
             
-            # Check public networks
-            public_networks = openstack.get_public_networks()
+            # Check public and external gateway networks concurrently
+            public_networks, external_networks = await asyncio.gather(
+                asyncio.to_thread(openstack.get_public_networks),
+                asyncio.to_thread(openstack.find_networks_with_external_gateway)
+            )
+            
             if public_networks:
                 services_text += f"\n*Public Networks Found:* {len(public_networks)}\n"
-                for net in public_networks[:3]:  # Show first 3
-                    services_text += f"• `{net['name']}`\n"
+                for net in islice(public_networks, 3):  # Show first 3
+                    services_text += f"• `{md_code(net['name'])}`\n"
             
-            # Check external gateway networks
-            external_networks = openstack.find_networks_with_external_gateway()
             if external_networks:
                 services_text += f"\n*Networks with External Gateway:* {len(external_networks)}\n"
             
@@ -2425,10 +2652,102 @@ async def status(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         await update.message.reply_text(status_text, parse_mode='Markdown')
         
-    except Exception as e:
-        logger.error(f"Error in status command: {str(e)}")
+    except Exception:
+        logger.exception("Error in status command")
         await update.message.reply_text("❌ Error checking status.")
 
+# Callback routes for exact callback_data values: handler(query, context)
+CALLBACK_ROUTES = {
+    'list_servers': lambda query, context: list_servers(query, context, page=0, refresh=True),
+    'list_networks': lambda query, context: list_networks(query),
+    'list_floating_ips': lambda query, context: list_floating_ips(query, context),
+    'add_floating_ip': add_floating_ip_menu,
+    'allocate_floating_ip': lambda query, context: allocate_floating_ip(query),
+    'associate_floating_ip': select_server_for_ip,
+    'create_network': create_network_menu,
+    'manage_fixed_ips': manage_fixed_ips,
+    'help': lambda query, context: show_help(query),
+    'back_to_main': lambda query, context: back_to_main(query),
+    'back_to_servers': lambda query, context: list_servers(query, context, page=0),
+    'back_to_floating_ips': lambda query, context: list_floating_ips(query, context),
+    'back_to_fixed_ips': manage_fixed_ips,
+    'cancel_operation': cancel_operation,
+}
+
+# Callback routes for "prefix|argument" values: handler(query, context, argument)
+CALLBACK_PREFIX_ROUTES = {
+    'list_servers_page': lambda query, context, page: list_servers(query, context, page=int(page)),
+    'list_networks_page': lambda query, context, page: list_networks(query, page=int(page)),
+    'list_floating_ips_page': lambda query, context, page: list_floating_ips(query, context, page=int(page)),
+    'server': show_server_details,
+    # Floating IP management handlers
+    'select_server': select_floating_ip,
+    'select_ip': confirm_associate_ip,
+    'confirm_associate': do_associate_ip,
+    'disassociate_ip': confirm_disassociate_ip,
+    'confirm_disassociate': lambda query, context, ip_id: do_disassociate_ip(query, ip_id),
+    'delete_ip': confirm_delete_ip,
+    'confirm_delete': lambda query, context, ip_id: do_delete_ip(query, ip_id),
+    # Fixed IP management handlers
+    'select_server_for_fixed_ip': manage_server_fixed_ips,
+    'add_fixed_ip': select_interface_for_fixed_ip,
+    'select_interface': select_network_for_fixed_ip,
+    'select_network': confirm_add_fixed_ip,
+    'confirm_add_fixed_ip': do_add_fixed_ip,
+    'remove_fixed_ip': select_fixed_ip_for_removal,
+    'confirm_remove_fixed_ip': do_remove_fixed_ip,
+}
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """Process updates from different chats concurrently, but one at a time within a chat"""
+    
+    def __init__(self, max_concurrent_updates):
+        super().__init__(max_concurrent_updates)
+        # chat_id -> updates waiting behind the one being processed for that chat
+        self._chat_queues = {}
+    
+    async def do_process_update(self, update, coroutine):
+        chat = getattr(update, 'effective_chat', None)
+        if chat is None:
+            await coroutine
+            return
+        
+        pending = self._chat_queues.get(chat.id)
+        if pending is not None:
+            # The chat's running update drains this one in arrival order; returning here frees the
+            # concurrency slot, so a busy chat holds at most one slot however fast it taps
+            pending.append(coroutine)
+            return
+        
+        pending = self._chat_queues[chat.id] = deque()
+        try:
+            while True:
+                try:
+                    await coroutine
+                except Exception:
+                    logger.exception(f"Error processing update for chat {chat.id}")
+                if not pending:
+                    break
+                coroutine = pending.popleft()
+        finally:
+            del self._chat_queues[chat.id]
+            # Only reached with updates left on cancellation; close them so they aren't left unawaited
+            for queued in pending:
+                queued.close()
+    
+    async def initialize(self):
+        pass
+    
+    async def shutdown(self):
+        pass
+
+async def configure_executor(application):
+    """Size the thread pool that asyncio.to_thread uses for OpenStack calls"""
+    # The default pool is min(32, CPUs + 4) workers, which caps concurrency on small VPSes
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=32, thread_name_prefix='openstack')
+    )
+
 def main():
     """Main function to run the bot"""
     # Get bot token from environment
@@ -2438,7 +2757,16 @@ def main():
         return
     
     # Create application
-    application = Application.builder().token(bot_token).build()
+    # Chats are served concurrently (in order within each chat); the rate limiter keeps
+    # outgoing calls within Telegram's flood limits and retries once on RetryAfter
+    application = (
+        Application.builder()
+        .token(bot_token)
+        .rate_limiter(AIORateLimiter(max_retries=1))
+        .concurrent_updates(ChatOrderedUpdateProcessor(64))
+        .post_init(configure_executor)
+        .build()
+    )
     
     # Add handlers
     application.add_handler(CommandHandler("start", start))
@@ -2447,12 +2775,18 @@ def main():
     
     # Test OpenStack connection on startup
     logger.info("Testing OpenStack connection...")
-    if openstack.authenticate():
+    if openstack.get_headers():
         logger.info("✅ OpenStack connection successful!")
         logger.info(f"Available services: {list(openstack.service_catalog.keys())}")
         
+        # Probe public and external gateway networks concurrently with the fresh token
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            public_future = executor.submit(openstack.get_public_networks)
+            external_future = executor.submit(openstack.find_networks_with_external_gateway)
+            public_networks = public_future.result()
+            external_networks = external_future.result()
+        
         # Test public networks
-        public_networks = openstack.get_public_networks()
         if public_networks:
             logger.info(f"Found {len(public_networks)} public networks:")
             for net in public_networks:
@@ -2461,14 +2795,26 @@ def main():
             logger.warning("No public networks found!")
             
         # Test external gateway networks
-        external_networks = openstack.find_networks_with_external_gateway()
         logger.info(f"Found {len(external_networks)} networks with external gateway access")
     else:
         logger.error("❌ OpenStack connection failed!")
     
     # Start the bot
-    logger.info("Starting OpenStack Telegram Bot...")
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    webhook_url = os.getenv('TELEGRAM_WEBHOOK_URL')
+    if webhook_url:
+        # Telegram pushes updates to us instead of the bot polling getUpdates
+        logger.info(f"Starting OpenStack Telegram Bot in webhook mode at {webhook_url}...")
+        application.run_webhook(
+            listen=os.getenv('TELEGRAM_WEBHOOK_LISTEN', '0.0.0.0'),
+            port=int(os.getenv('TELEGRAM_WEBHOOK_PORT', '8443')),
+            url_path=os.getenv('TELEGRAM_WEBHOOK_PATH', 'telegram'),
+            webhook_url=webhook_url,
+            secret_token=os.getenv('TELEGRAM_WEBHOOK_SECRET'),
+            allowed_updates=Update.ALL_TYPES
+        )
+    else:
+        logger.info("Starting OpenStack Telegram Bot...")
+        application.run_polling(allowed_updates=Update.ALL_TYPES)
 
 if __name__ == '__main__':
     main()